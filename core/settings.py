@@ -86,3 +86,24 @@ STATICFILES_DIRS = [
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 USE_TZ = True
+
+# Circuit breaker y hedged requests por host de RapidAPI
+# (ver django_backend/scripts/resiliencia.py para las claves disponibles)
+SCRAPER_RESILIENCE = {
+    'default': {'failure_threshold': 3, 'reset_timeout': 60},
+    'tk': {'posts': {'hedge': True}},
+    'x': {'posts': {'hedge': True}},
+}
+
+# Fan-out multi-plataforma de trigger_extraction
+SCRAPER_MAX_PARALLEL_PIPELINES = 3   # pipelines simultáneos en todo el proceso
+SCRAPER_INFLIGHT_TARGET_BUDGET = 200 # perfiles en vuelo en todo el proceso (todas las llamadas)
+
+# TTL (segundos) de la caché en memoria de llaves activas, por proceso
+SCRAPER_KEY_CACHE_SECONDS = 60
+
+# Pipeline fetch -> parse -> (db, csv) de cada scraper
+# (ver django_backend/scripts/pipeline.py para las claves disponibles)
+SCRAPER_PIPELINE = {
+    'default': {'fetch_workers': 2, 'parse_workers': 1, 'db_workers': 1, 'queue_size': 8},
+}
@@ -0,0 +1,195 @@
+import threading
+import uuid
+import datetime
+import logging
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Límite global de pipelines de plataforma corriendo a la vez en este proceso,
+# compartido por todos los jobs (cada pipeline consume cuota de RapidAPI).
+_pipeline_slots = threading.BoundedSemaphore(getattr(settings, 'SCRAPER_MAX_PARALLEL_PIPELINES', 3))
+
+# Presupuesto global de perfiles en vuelo (encolados o procesándose) en todo
+# el proceso; cada job reserva sus perfiles al iniciar y los libera al avanzar.
+_en_vuelo = 0
+_en_vuelo_lock = threading.Lock()
+
+
+class PresupuestoExcedido(Exception):
+    """No hay presupuesto global libre ahora para los perfiles que pide el job."""
+
+
+class JobDemasiadoGrande(Exception):
+    """El job pide más perfiles que el presupuesto completo: nunca va a entrar."""
+
+
+def _reservar(cantidad):
+    global _en_vuelo
+    presupuesto = getattr(settings, 'SCRAPER_INFLIGHT_TARGET_BUDGET', 200)
+    if cantidad > presupuesto:
+        raise JobDemasiadoGrande(
+            f'El job pide {cantidad} perfiles y el máximo por extracción es {presupuesto}; '
+            f'divídelo en varias llamadas'
+        )
+    with _en_vuelo_lock:
+        if _en_vuelo + cantidad > presupuesto:
+            raise PresupuestoExcedido(
+                f'Presupuesto de {presupuesto} perfiles en vuelo agotado '
+                f'({_en_vuelo} en curso, se piden {cantidad})'
+            )
+        _en_vuelo += cantidad
+
+
+def _liberar(cantidad):
+    global _en_vuelo
+    if cantidad > 0:
+        with _en_vuelo_lock:
+            _en_vuelo = max(0, _en_vuelo - cantidad)
+
+
+def targets_en_vuelo():
+    with _en_vuelo_lock:
+        return _en_vuelo
+
+JOB_RETENTION_HOURS = 1
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+class ExtractionJob:
+    """
+    Agrupa los pipelines de varias plataformas lanzados por una sola llamada
+    a trigger_extraction y expone el progreso combinado y un ETA.
+    """
+
+    def __init__(self, plan):
+        # plan: {platform: (funcion_iniciar, args_sin_targets, targets)}
+        self.id = uuid.uuid4().hex
+        self.plan = plan
+        self.started_at = timezone.now()
+        self.finished_at = None
+        self.total = sum(len(targets) for _, _, targets in plan.values())
+        self.done = {platform: 0 for platform in plan}
+        # Desenlace por perfil: 'ok', 'skipped' (circuito abierto / sin keys) o 'failed'
+        self.resultados = {platform: {'ok': 0, 'skipped': 0, 'failed': 0} for platform in plan}
+        self.status = {platform: 'queued' for platform in plan}
+        self.errors = {}
+        self._pipelines = {}
+        self._liberados = {platform: 0 for platform in plan}
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Reserva presupuesto y lanza los pipelines. Lanza JobDemasiadoGrande si
+        el job excede el presupuesto completo y PresupuestoExcedido si no
+        alcanza con lo que hay en vuelo.
+        """
+        _reservar(self.total)
+        limite = timezone.now() - datetime.timedelta(hours=JOB_RETENTION_HOURS)
+        with _jobs_lock:
+            for job_id in [j for j, job in _jobs.items() if job.finished_at and job.finished_at < limite]:
+                del _jobs[job_id]
+            _jobs[self.id] = self
+        for platform, (funcion, args, targets) in self.plan.items():
+            thread = threading.Thread(target=self._run_platform, args=(platform, funcion, args, targets))
+            thread.daemon = True
+            thread.start()
+        return self
+
+    def _run_platform(self, platform, funcion, args, targets):
+        with _pipeline_slots:
+            self._set_status(platform, 'running')
+            estado = 'failed'
+            try:
+                funcion(*args, targets,
+                        progreso=lambda target, resultado: self._avanzar(platform, resultado),
+                        registrar_pipeline=lambda pipeline: self._registrar_pipeline(platform, pipeline))
+                estado = 'done'
+            except Exception as e:
+                logger.error(f"Error en pipeline {platform} del job {self.id}: {e}")
+                with self._lock:
+                    self.errors[platform] = str(e)
+            finally:
+                # Libera lo que no se reportó como terminado (errores, cortes)
+                # y lo cuenta como fallido
+                with self._lock:
+                    pendientes = len(targets) - self._liberados[platform]
+                    self._liberados[platform] = len(targets)
+                    sin_reportar = max(0, len(targets) - self.done[platform])
+                    self.done[platform] += sin_reportar
+                    self.resultados[platform]['failed'] += sin_reportar
+                _liberar(pendientes)
+                self._set_status(platform, estado)
+
+    def _registrar_pipeline(self, platform, pipeline):
+        with self._lock:
+            self._pipelines[platform] = pipeline
+
+    def _avanzar(self, platform, resultado):
+        with self._lock:
+            self.done[platform] += 1
+            self.resultados[platform][resultado] += 1
+            if self._liberados[platform] >= len(self.plan[platform][2]):
+                return
+            self._liberados[platform] += 1
+        _liberar(1)
+
+    def _set_status(self, platform, value):
+        with self._lock:
+            self.status[platform] = value
+            if all(s in ('done', 'failed') for s in self.status.values()):
+                self.finished_at = timezone.now()
+
+    def to_dict(self):
+        with self._lock:
+            pipelines = dict(self._pipelines)
+        # Colas y throughput por etapa en vivo, para ubicar el cuello de botella
+        stages = {platform: pipeline.stats() for platform, pipeline in pipelines.items()}
+
+        with self._lock:
+            procesados = sum(self.done.values())
+            totales = {
+                resultado: sum(r[resultado] for r in self.resultados.values())
+                for resultado in ('ok', 'skipped', 'failed')
+            }
+            elapsed = ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+            eta = None
+            if self.finished_at:
+                eta = 0
+            elif procesados:
+                eta = round(elapsed / procesados * (self.total - procesados), 1)
+
+            return {
+                'job_id': self.id,
+                'started_at': self.started_at.isoformat(),
+                'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+                'total_targets': self.total,
+                'processed_targets': procesados,
+                'completed_targets': totales['ok'],
+                'skipped_targets': totales['skipped'],
+                'failed_targets': totales['failed'],
+                'progress': round(procesados * 100.0 / self.total, 1) if self.total else 100.0,
+                'eta_seconds': eta,
+                'platforms': {
+                    platform: {
+                        'status': self.status[platform],
+                        'processed': self.done[platform],
+                        'completed': self.resultados[platform]['ok'],
+                        'skipped': self.resultados[platform]['skipped'],
+                        'failed': self.resultados[platform]['failed'],
+                        'total': len(self.plan[platform][2]),
+                    }
+                    for platform in self.plan
+                },
+                'errors': dict(self.errors),
+                'stages': stages,
+            }
+
+
+def get_job(job_id):
+    with _jobs_lock:
+        return _jobs.get(job_id)
@@ -0,0 +1,142 @@
+import random
+import time
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from django_backend.models import Profile, FollowerSnapshot, ScrapeResult
+
+# Mezcla aproximada de la base de producción actual
+MEZCLA_DEFAULT = 'ig=0.07,tk=0.78,x=0.15'
+
+PALABRAS = (
+    'nuevo', 'video', 'hoy', 'gracias', 'tour', 'live', 'fans', 'music', 'drop', 'link',
+    'bio', 'show', 'mañana', 'ticket', 'love', 'team', 'launch', 'promo', 'collab', 'vlog',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera ScrapeResult sintéticos a la escala pedida (mezcla de plataformas, "
+        "cardinalidad de usuarios y rango de fechas) para pruebas de carga."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Posts a generar')
+        parser.add_argument('--profiles', type=int, default=5_000, help='Perfiles distintos')
+        parser.add_argument('--days', type=int, default=365, help='Días hacia atrás para created_at')
+        parser.add_argument('--mix', default=MEZCLA_DEFAULT, help='Mezcla de plataformas, ej. ig=0.1,tk=0.8,x=0.1')
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--reset', action='store_true',
+                            help='Borra antes los perfiles sintéticos (y sus posts/snapshots)')
+
+    def _parsear_mezcla(self, mezcla):
+        try:
+            pesos = {p: float(w) for p, w in (parte.split('=') for parte in mezcla.split(','))}
+        except ValueError:
+            raise CommandError(f"Mezcla inválida: {mezcla}")
+        if not pesos or sum(pesos.values()) <= 0:
+            raise CommandError(f"Mezcla inválida: {mezcla}")
+        return pesos
+
+    def _crear_perfiles(self, rnd, pesos, total):
+        """
+        Crea (o reutiliza) synth_<platform>_<i> para i < total. Solo se usan
+        los handles de esta corrida, así --profiles fija la cardinalidad
+        aunque queden perfiles de corridas anteriores.
+        """
+        plataformas, w = list(pesos), list(pesos.values())
+        perfiles = []
+        for i in range(total):
+            platform = rnd.choices(plataformas, w)[0]
+            # Seguidores con cola larga: la mayoría miles, unos pocos cientos de millones
+            followers = int(rnd.lognormvariate(10, 2.5))
+            perfiles.append(Profile(
+                platform=platform,
+                handle=f"synth_{platform}_{i}",
+                native_id=str(10_000_000 + i),
+                followers=followers,
+            ))
+        Profile.objects.bulk_create(perfiles, batch_size=1000, ignore_conflicts=True)
+
+        handles = [p.handle for p in perfiles]
+        creados = []
+        for i in range(0, len(handles), 500):
+            creados.extend(Profile.objects.filter(handle__in=handles[i:i + 500]).only('id', 'platform', 'followers'))
+        FollowerSnapshot.objects.bulk_create(
+            [FollowerSnapshot(profile=p, followers=p.followers) for p in creados], batch_size=1000
+        )
+        return creados
+
+    def _insertar(self, lote):
+        """
+        INSERT directo de un lote de ScrapeResult. bulk_create pisaría
+        created_at (auto_now_add) con "ahora"; así la fecha repartida se
+        escribe en el mismo INSERT, sin una segunda pasada por fila.
+        """
+        campos = [f for f in ScrapeResult._meta.concrete_fields if not f.primary_key]
+        tabla = connection.ops.quote_name(ScrapeResult._meta.db_table)
+        columnas = ', '.join(connection.ops.quote_name(f.column) for f in campos)
+        sql = f"INSERT INTO {tabla} ({columnas}) VALUES ({', '.join(['%s'] * len(campos))})"
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, [
+                [f.get_db_prep_save(getattr(post, f.attname), connection) for f in campos] for post in lote
+            ])
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError("--days debe ser >= 1")
+        if options['rows'] < 0 or options['profiles'] < 1 or options['batch_size'] < 1:
+            raise CommandError("--rows debe ser >= 0; --profiles y --batch-size, >= 1")
+
+        if options['reset']:
+            borrados, _ = Profile.objects.filter(handle__startswith='synth_').delete()
+            self.stdout.write(f"Borrados {borrados} registros sintéticos previos")
+
+        rnd = random.Random(options['seed'])
+        pesos = self._parsear_mezcla(options['mix'])
+        filas, batch = options['rows'], options['batch_size']
+        ahora = timezone.now()
+        rango = options['days'] * 86400
+
+        self.stdout.write(f"Creando {options['profiles']} perfiles...")
+        perfiles = self._crear_perfiles(rnd, pesos, options['profiles'])
+        if not perfiles:
+            raise CommandError("No hay perfiles sintéticos para asociar los posts")
+
+        # Ley de Zipf aproximada: pocos perfiles concentran la mayoría de posts
+        pesos_perfil = [1.0 / (i + 1) for i in range(len(perfiles))]
+        acumulados = list(pesos_perfil)
+        for i in range(1, len(acumulados)):
+            acumulados[i] += acumulados[i - 1]
+
+        inicio = time.monotonic()
+        generadas = 0
+        while generadas < filas:
+            n = min(batch, filas - generadas)
+            elegidos = rnd.choices(perfiles, cum_weights=acumulados, k=n)
+            lote = []
+            for perfil in elegidos:
+                created_at = ahora - datetime.timedelta(seconds=rnd.randrange(rango))
+                likes = int(rnd.lognormvariate(6, 2))
+                lote.append(ScrapeResult(
+                    platform=perfil.platform,
+                    profile=perfil,
+                    post_date=created_at - datetime.timedelta(seconds=rnd.randrange(3 * 86400)),
+                    likes=min(likes, 2_000_000_000),
+                    comments=min(likes // rnd.randint(20, 200), 2_000_000_000),
+                    views=min(likes * rnd.randint(5, 40) if perfil.platform != 'ig' else 0, 2_000_000_000),
+                    description=' '.join(rnd.choices(PALABRAS, k=rnd.randint(3, 15))),
+                    created_at=created_at,
+                ))
+            self._insertar(lote)
+            generadas += n
+            velocidad = generadas / max(time.monotonic() - inicio, 1e-6)
+            self.stdout.write(f"  {generadas}/{filas} posts ({velocidad:,.0f} filas/s)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Listo: {filas} posts sobre {len(perfiles)} perfiles en {time.monotonic() - inicio:.1f}s"
+        ))
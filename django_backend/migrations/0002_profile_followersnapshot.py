@@ -0,0 +1,124 @@
+import bisect
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def poblar_perfiles(apps, schema_editor):
+    """
+    Crea un Profile por cada (platform, username) existente, con el último
+    conteo de seguidores visto, y conserva el histórico por post como
+    snapshots: uno cada vez que cambia el conteo, fechado en el primer
+    created_at en que aparece el nuevo valor.
+    """
+    Profile = apps.get_model('django_backend', 'Profile')
+    FollowerSnapshot = apps.get_model('django_backend', 'FollowerSnapshot')
+    ScrapeResult = apps.get_model('django_backend', 'ScrapeResult')
+
+    historial = {}
+    filas = ScrapeResult.objects.order_by('created_at', 'id').values_list('platform', 'username', 'followers', 'created_at')
+    for platform, username, followers, created_at in filas.iterator():
+        cambios = historial.setdefault((platform, username), [])
+        if not cambios or cambios[-1][0] != (followers or 0):
+            cambios.append((followers or 0, created_at))
+
+    # captured_at es auto_now_add: un INSERT directo conserva la fecha histórica
+    connection = schema_editor.connection
+    tabla = connection.ops.quote_name(FollowerSnapshot._meta.db_table)
+    sql = f"INSERT INTO {tabla} (profile_id, followers, captured_at) VALUES (%s, %s, %s)"
+
+    for (platform, username), cambios in historial.items():
+        profile = Profile.objects.create(platform=platform, handle=username, followers=cambios[-1][0])
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, [
+                (profile.pk, followers, connection.ops.adapt_datetimefield_value(captured_at))
+                for followers, captured_at in cambios
+            ])
+        ScrapeResult.objects.filter(platform=platform, username=username).update(profile=profile)
+
+
+def restaurar_username(apps, schema_editor):
+    """Cada post recupera el conteo del snapshot vigente cuando se extrajo."""
+    ScrapeResult = apps.get_model('django_backend', 'ScrapeResult')
+    FollowerSnapshot = apps.get_model('django_backend', 'FollowerSnapshot')
+
+    historial = {}
+    for profile_id, captured_at, followers in (
+        FollowerSnapshot.objects.order_by('captured_at').values_list('profile_id', 'captured_at', 'followers').iterator()
+    ):
+        fechas, conteos = historial.setdefault(profile_id, ([], []))
+        fechas.append(captured_at)
+        conteos.append(followers)
+
+    for post in ScrapeResult.objects.select_related('profile').iterator():
+        followers = post.profile.followers
+        if post.profile_id in historial:
+            fechas, conteos = historial[post.profile_id]
+            followers = conteos[max(bisect.bisect_right(fechas, post.created_at) - 1, 0)]
+        post.username = post.profile.handle
+        post.followers = followers
+        post.save(update_fields=['username', 'followers'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_backend', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Profile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(max_length=10)),
+                ('handle', models.CharField(max_length=255)),
+                ('native_id', models.CharField(blank=True, max_length=255)),
+                ('followers', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('platform', 'handle'), name='unique_profile_platform_handle')],
+            },
+        ),
+        migrations.CreateModel(
+            name='FollowerSnapshot',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('followers', models.BigIntegerField(default=0)),
+                ('captured_at', models.DateTimeField(auto_now_add=True)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='django_backend.profile')),
+            ],
+            options={
+                'ordering': ['-captured_at'],
+                'indexes': [models.Index(fields=['profile', '-captured_at'], name='snapshot_profile_captured_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='scraperesult',
+            name='profile',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='posts', to='django_backend.profile'),
+        ),
+        # username pasa a ser nullable antes de copiar los datos: al revertir,
+        # RemoveField lo vuelve a crear así y restaurar_username lo rellena
+        # antes de que este AlterField restaure el NOT NULL original.
+        migrations.AlterField(
+            model_name='scraperesult',
+            name='username',
+            field=models.CharField(max_length=255, null=True),
+        ),
+        migrations.RunPython(poblar_perfiles, restaurar_username),
+        migrations.RemoveField(
+            model_name='scraperesult',
+            name='username',
+        ),
+        migrations.RemoveField(
+            model_name='scraperesult',
+            name='followers',
+        ),
+        migrations.AlterField(
+            model_name='scraperesult',
+            name='profile',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='posts', to='django_backend.profile'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_backend', '0002_profile_followersnapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scraperkey',
+            index=models.Index(fields=['platform', 'is_active'], name='scraperkey_platform_active_idx'),
+        ),
+    ]
@@ -1,7 +1,102 @@
 
-from django.db import models
+import threading
+import time
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 
+# Caché en memoria de llaves activas por plataforma: {platform: (expira, {purpose: [keys]})}.
+# Se invalida al sincronizar; el TTL acota lo desactualizados que pueden
+# quedar otros procesos/workers.
+_keys_cache = {}
+_keys_cache_lock = threading.Lock()
+# Generación por plataforma (y global, para invalidate_cache() sin plataforma):
+# una lectura solo se guarda si nadie invalidó mientras consultaba la DB.
+_keys_cache_gen = {}
+_keys_cache_gen_global = 0
+
+
+class ScraperKeyManager(models.Manager):
+
+    def active_keys(self, platform, purpose=None):
+        """
+        Llaves activas de la plataforma, servidas desde memoria.
+        Sin `purpose` devuelve todas las llaves activas de la plataforma.
+        """
+        ahora = time.monotonic()
+        with _keys_cache_lock:
+            entrada = _keys_cache.get(platform)
+            generacion = (_keys_cache_gen_global, _keys_cache_gen.get(platform, 0))
+        if entrada is None or entrada[0] < ahora:
+            por_purpose = {}
+            filas = self.filter(platform=platform, is_active=True).order_by('id').values_list('purpose', 'key_value')
+            for key_purpose, key_value in filas:
+                por_purpose.setdefault(key_purpose, []).append(key_value)
+            entrada = (ahora + getattr(settings, 'SCRAPER_KEY_CACHE_SECONDS', 60), por_purpose)
+            with _keys_cache_lock:
+                # Si un sync invalidó durante la consulta, lo leído puede ser el
+                # set anterior: se devuelve pero no se cachea
+                if generacion == (_keys_cache_gen_global, _keys_cache_gen.get(platform, 0)):
+                    _keys_cache[platform] = entrada
+
+        por_purpose = entrada[1]
+        if purpose is None:
+            return [k for keys in por_purpose.values() for k in keys]
+        return list(por_purpose.get(purpose, ()))
+
+    def invalidate_cache(self, platform=None):
+        global _keys_cache_gen_global
+        with _keys_cache_lock:
+            if platform is None:
+                _keys_cache_gen_global += 1
+                _keys_cache.clear()
+            else:
+                _keys_cache_gen[platform] = _keys_cache_gen.get(platform, 0) + 1
+                _keys_cache.pop(platform, None)
+
+    def sync(self, platform, purpose, keys):
+        """
+        Deja como activas exactamente `keys` para platform/purpose.
+        Reactiva las filas existentes (conservando su historial), desactiva
+        las que ya no vienen, inserta las nuevas con bulk_create y borra
+        filas duplicadas. Debe llamarse dentro de transaction.atomic().
+        """
+        enviadas = list(dict.fromkeys(k.strip() for k in keys if k and k.strip()))
+
+        # Por cada key_value se conserva la fila activa o, si no hay, la de
+        # last_used más reciente; el resto son duplicados a borrar.
+        existentes = {}
+        duplicadas = []
+        filas = self.filter(platform=platform, purpose=purpose).order_by('-is_active', '-last_used', '-id')
+        for pk, key_value, is_active in filas.values_list('id', 'key_value', 'is_active'):
+            if key_value in existentes:
+                duplicadas.append(pk)
+            else:
+                existentes[key_value] = (pk, is_active)
+
+        conjunto = set(enviadas)
+        reactivar = [pk for k, (pk, activa) in existentes.items() if k in conjunto and not activa]
+        desactivar = [pk for k, (pk, activa) in existentes.items() if k not in conjunto and activa]
+        nuevas = [k for k in enviadas if k not in existentes]
+
+        if duplicadas:
+            self.filter(pk__in=duplicadas).delete()
+        if reactivar:
+            self.filter(pk__in=reactivar).update(is_active=True)
+        if desactivar:
+            self.filter(pk__in=desactivar).update(is_active=False)
+        if nuevas:
+            self.bulk_create([
+                self.model(platform=platform, purpose=purpose, key_value=k, is_active=True) for k in nuevas
+            ])
+
+        transaction.on_commit(lambda: self.invalidate_cache(platform))
+        return {'created': len(nuevas), 'reactivated': len(reactivar), 'deactivated': len(desactivar)}
+
+
 class ScraperKey(models.Model):
     PLATFORM_CHOICES = [
         ('ig', 'Instagram'),
@@ -14,10 +109,84 @@ class ScraperKey(models.Model):
     is_active = models.BooleanField(default=True)
     last_used = models.DateTimeField(auto_now=True)
 
-class ScrapeResult(models.Model):
+    objects = ScraperKeyManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['platform', 'is_active'], name='scraperkey_platform_active_idx'),
+        ]
+
+class ProfileManager(models.Manager):
+
+    def record_snapshot(self, platform, handle, followers, native_id=''):
+        """
+        Obtiene (o crea) el perfil y registra un snapshot de seguidores.
+        Se llama una vez por perfil y ejecución, no una vez por post.
+        Con `followers=None` (no hubo lectura en vivo) conserva el último
+        valor conocido y no registra snapshot.
+        """
+        en_vivo = isinstance(followers, int)
+        profile, created = self.get_or_create(
+            platform=platform,
+            handle=handle,
+            defaults={'native_id': native_id or '', 'followers': followers if en_vivo else 0},
+        )
+        if not created:
+            if en_vivo:
+                profile.followers = followers
+            if native_id:
+                profile.native_id = native_id
+            profile.save(update_fields=['followers', 'native_id', 'updated_at'])
+
+        if en_vivo:
+            FollowerSnapshot.objects.create(profile=profile, followers=followers)
+        return profile
+
+class Profile(models.Model):
     platform = models.CharField(max_length=10)
-    username = models.CharField(max_length=255)
+    handle = models.CharField(max_length=255)
+    native_id = models.CharField(max_length=255, blank=True)
+    # Último valor conocido; el histórico vive en FollowerSnapshot
+    followers = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ProfileManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['platform', 'handle'], name='unique_profile_platform_handle'),
+        ]
+
+    def __str__(self):
+        return f"{self.platform}:{self.handle}"
+
+class FollowerSnapshot(models.Model):
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='snapshots')
     followers = models.BigIntegerField(default=0)
+    captured_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-captured_at']
+        indexes = [
+            models.Index(fields=['profile', '-captured_at'], name='snapshot_profile_captured_idx'),
+        ]
+
+class ScrapeResultManager(models.Manager):
+
+    def with_followers(self):
+        """
+        Anota `followers_at_post`: los seguidores del snapshot vigente cuando
+        se extrajo el post (el último con captured_at <= created_at), o el
+        valor actual del perfil si no hay ninguno anterior.
+        """
+        snapshot = FollowerSnapshot.objects.filter(
+            profile=OuterRef('profile'), captured_at__lte=OuterRef('created_at'),
+        ).order_by('-captured_at').values('followers')[:1]
+        return self.annotate(followers_at_post=Coalesce(Subquery(snapshot), F('profile__followers')))
+
+class ScrapeResult(models.Model):
+    platform = models.CharField(max_length=10)
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='posts')
     post_date = models.DateTimeField(null=True)
     likes = models.IntegerField(default=0)
     comments = models.IntegerField(default=0)
@@ -26,5 +195,7 @@ class ScrapeResult(models.Model):
     raw_data = models.JSONField(null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ScrapeResultManager()
+
     class Meta:
         ordering = ['-created_at']
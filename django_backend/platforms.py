@@ -0,0 +1,75 @@
+import importlib
+import threading
+
+
+class PlatformDescriptor:
+    """
+    Describe una plataforma de scraping sin importar su módulo.
+    El módulo (y con él requests, csv, etc.) se importa la primera vez
+    que se pide un entry point, así los workers que solo sirven lecturas
+    no pagan el coste de los scrapers.
+    """
+
+    def __init__(self, key, label, fetch, parse, key_purposes=()):
+        self.key = key
+        self.label = label
+        # Entry points como 'modulo:atributo'; se resuelven bajo demanda
+        self.fetch_path = fetch
+        self.parse_path = parse
+        # Propósitos de llave requeridos, en el orden en que los recibe `fetch`.
+        # Vacío = una sola lista con todas las llaves activas de la plataforma.
+        self.key_purposes = tuple(key_purposes)
+        self._resueltos = {}
+        self._lock = threading.Lock()
+
+    def _resolver(self, path):
+        if path not in self._resueltos:
+            with self._lock:
+                if path not in self._resueltos:
+                    modulo, atributo = path.split(':')
+                    self._resueltos[path] = getattr(importlib.import_module(modulo), atributo)
+        return self._resueltos[path]
+
+    @property
+    def fetch(self):
+        return self._resolver(self.fetch_path)
+
+    @property
+    def parse(self):
+        """Parser del payload de posts (ver scripts/parsers.py)."""
+        return self._resolver(self.parse_path)
+
+
+_registry = {}
+
+
+def register(descriptor):
+    _registry[descriptor.key] = descriptor
+    return descriptor
+
+
+def get_platform(key):
+    return _registry.get(key)
+
+
+def all_platforms():
+    return list(_registry.values())
+
+
+register(PlatformDescriptor(
+    'ig', 'Instagram',
+    fetch='django_backend.scripts.script_ig:iniciar',
+    parse='django_backend.scripts.parsers:parse_ig',
+))
+register(PlatformDescriptor(
+    'tk', 'TikTok',
+    fetch='django_backend.scripts.script_tk:iniciar',
+    parse='django_backend.scripts.parsers:parse_tk_posts',
+    key_purposes=('search', 'posts'),
+))
+register(PlatformDescriptor(
+    'x', 'X/Twitter',
+    fetch='django_backend.scripts.script_x:iniciar',
+    parse='django_backend.scripts.parsers:parse_x_timeline',
+    key_purposes=('search', 'posts'),
+))
@@ -0,0 +1,93 @@
+import sys
+import time
+import random
+import argparse
+import threading
+import statistics
+
+import requests
+
+# Endpoints del ScraperViewSet y generadores de query params para cada uno
+ENDPOINTS = {
+    'latest_results': lambda rnd: {'limit': rnd.choice((50, 100, 1000)), 'platform': rnd.choice(('', 'ig', 'tk', 'x'))},
+    'user_history': lambda rnd: {'query': f"synth_{rnd.choice(('ig', 'tk', 'x'))}_{rnd.randrange(1000)}"},
+    'get_metrics': lambda rnd: {},
+}
+
+
+def _percentil(ordenadas, p):
+    if not ordenadas:
+        return 0.0
+    pos = min(len(ordenadas) - 1, int(round(p / 100.0 * (len(ordenadas) - 1))))
+    return ordenadas[pos]
+
+
+def _cliente(base_url, endpoints, fin, resultados, lock, semilla):
+    rnd = random.Random(semilla)
+    sesion = requests.Session()
+    while time.monotonic() < fin:
+        nombre = rnd.choice(endpoints)
+        params = {k: v for k, v in ENDPOINTS[nombre](rnd).items() if v != ''}
+        inicio = time.perf_counter()
+        try:
+            ok = sesion.get(f"{base_url}/api/scraper/{nombre}/", params=params, timeout=120).status_code == 200
+        except requests.RequestException:
+            ok = False
+        latencia = (time.perf_counter() - inicio) * 1000
+        with lock:
+            resultados[nombre].append((latencia, ok))
+
+
+def ejecutar(base_url, clientes, duracion, endpoints):
+    """
+    Lanza `clientes` hilos concurrentes contra un servidor local durante
+    `duracion` segundos y reporta p50/p95/p99 y throughput por endpoint.
+    """
+    resultados = {nombre: [] for nombre in endpoints}
+    lock = threading.Lock()
+    fin = time.monotonic() + duracion
+
+    hilos = [
+        threading.Thread(target=_cliente, args=(base_url, endpoints, fin, resultados, lock, i), daemon=True)
+        for i in range(clientes)
+    ]
+    inicio = time.monotonic()
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    transcurrido = time.monotonic() - inicio
+
+    print("="*86)
+    print(f"   PRUEBA DE CARGA: {base_url} | {clientes} clientes | {transcurrido:.1f}s")
+    print("="*86)
+    print(f"{'ENDPOINT':<16} | {'REQS':>6} | {'ERRORES':>7} | {'REQ/S':>7} | {'P50 ms':>8} | {'P95 ms':>8} | {'P99 ms':>8}")
+    print("-" * 86)
+    for nombre, muestras in resultados.items():
+        latencias = sorted(l for l, _ in muestras)
+        errores = sum(1 for _, ok in muestras if not ok)
+        print(
+            f"{nombre:<16} | {len(muestras):>6} | {errores:>7} | {len(muestras) / transcurrido:>7.1f} | "
+            f"{_percentil(latencias, 50):>8.1f} | {_percentil(latencias, 95):>8.1f} | {_percentil(latencias, 99):>8.1f}"
+        )
+    total = sum(len(m) for m in resultados.values())
+    todas = [l for m in resultados.values() for l, _ in m]
+    print("-" * 86)
+    print(f"{'TOTAL':<16} | {total:>6} | {'':>7} | {total / transcurrido:>7.1f} | "
+          f"{statistics.median(todas) if todas else 0:>8.1f} |")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga de los endpoints del ScraperViewSet")
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS),
+                        help='Lista separada por comas: ' + ', '.join(ENDPOINTS))
+    args = parser.parse_args()
+
+    seleccion = [e for e in args.endpoints.split(',') if e]
+    desconocidos = [e for e in seleccion if e not in ENDPOINTS]
+    if desconocidos:
+        sys.exit(f"Endpoints desconocidos: {', '.join(desconocidos)}")
+    ejecutar(args.url.rstrip('/'), args.clients, args.duration, seleccion)
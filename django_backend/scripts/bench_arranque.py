@@ -0,0 +1,54 @@
+import os
+import sys
+import json
+import statistics
+import subprocess
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+
+# Lo que hace un worker al arrancar: configurar Django y cargar las URLs/vistas.
+# Al final se reporta si los scrapers (y requests) llegaron a importarse.
+ARRANQUE = """
+import time, sys, os, json
+t0 = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+import django
+django.setup()
+import core.urls
+t1 = time.perf_counter()
+print(json.dumps({
+    'segundos': t1 - t0,
+    'modulos': len(sys.modules),
+    'requests': 'requests' in sys.modules,
+    'scrapers': sorted(m for m in sys.modules if m.startswith('django_backend.scripts.')),
+}))
+"""
+
+
+def medir(repeticiones=10):
+    """
+    Mide el arranque en frío de un worker lanzando un intérprete nuevo por
+    repetición (sin caché de módulos compartida entre mediciones).
+    """
+    muestras = []
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, '-c', ARRANQUE],
+            cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout
+        muestras.append(json.loads(salida.strip().splitlines()[-1]))
+
+    tiempos = sorted(m['segundos'] * 1000 for m in muestras)
+    print("="*50)
+    print("   ARRANQUE EN FRÍO DEL WORKER (django.setup + urls)")
+    print("="*50)
+    print(f"Repeticiones:        {repeticiones}")
+    print(f"Mediana:             {statistics.median(tiempos):.1f} ms")
+    print(f"Mínimo / Máximo:     {tiempos[0]:.1f} / {tiempos[-1]:.1f} ms")
+    print(f"Módulos cargados:    {muestras[-1]['modulos']}")
+    print(f"requests importado:  {muestras[-1]['requests']}")
+    print(f"Scrapers importados: {muestras[-1]['scrapers'] or 'ninguno'}")
+
+
+if __name__ == "__main__":
+    medir(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,100 @@
+import os
+import sys
+import csv
+import glob
+import json
+import time
+from datetime import datetime
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.append(RAIZ)
+
+from django_backend.platforms import get_platform
+
+
+def _filas_csv(patron):
+    filas = []
+    for ruta in sorted(glob.glob(os.path.join(RAIZ, 'results', patron))):
+        with open(ruta, newline='', encoding='utf-8-sig') as f:
+            filas.extend(csv.DictReader(f))
+    return filas
+
+
+def _ts(texto, formato):
+    try:
+        return int(datetime.strptime(texto, formato).timestamp())
+    except (TypeError, ValueError):
+        return None
+
+
+def payloads_desde_csv():
+    """
+    Reconstruye payloads con la forma de cada API a partir de los CSV de
+    results/, para cuando no hay respuestas grabadas a mano.
+    """
+    ig = {'data': {'user': {'id': '1', 'edge_followed_by': {'count': 1}, 'edge_owner_to_timeline_media': {'edges': [
+        {'node': {
+            'taken_at_timestamp': _ts(f['FECHA'], '%d/%m/%Y'),
+            'edge_liked_by': {'count': int(f['LIKES'] or 0)},
+            'edge_media_to_comment': {'count': int(f['COMMS'] or 0)},
+            'edge_media_to_caption': {'edges': [{'node': {'text': f['DESCRIPCION']}}]},
+        }} for f in _filas_csv('datos_ig_*.csv')
+    ]}}}}
+    tk = {'data': {'videos': [
+        {'create_time': _ts(f['FECHA_POST'], '%d/%m/%Y %H:%M:%S'), 'digg_count': int(f['LIKES_VIDEO'] or 0),
+         'comment_count': 0, 'play_count': int(f['VISTAS'] or 0), 'title': f['DESCRIPCION']}
+        for f in _filas_csv('datos_tk_*.csv')
+    ]}}
+    x = {'timeline': [
+        {'created_at': datetime.strptime(f['FECHA_POST'], '%d/%m/%Y %H:%M:%S').strftime('%a %b %d %H:%M:%S +0000 %Y'),
+         'favorites': int(f['LIKES'] or 0), 'replies': int(f['REPLIES'] or 0),
+         'retweets': int(f['RETWEETS'] or 0), 'views': f['VISTAS'], 'text': f['DESCRIPCION']}
+        for f in _filas_csv('datos_X_*.csv')
+    ]}
+    return {'ig': [json.dumps(ig).encode()], 'tk': [json.dumps(tk).encode()], 'x': [json.dumps(x).encode()]}
+
+
+def payloads_grabados(directorio):
+    """Lee respuestas grabadas: <directorio>/{ig,tk,x}_*.json"""
+    grabados = {}
+    for platform in ('ig', 'tk', 'x'):
+        for ruta in sorted(glob.glob(os.path.join(directorio, f'{platform}_*.json'))):
+            with open(ruta, 'rb') as f:
+                grabados.setdefault(platform, []).append(f.read())
+    return grabados
+
+
+def _contar(resultado):
+    # parse_ig devuelve (user_id, seguidores, registros)
+    return len(resultado[2]) if isinstance(resultado, tuple) else len(resultado or ())
+
+
+def medir(payloads, repeticiones=200):
+    print("="*64)
+    print(f"   {'PLATAFORMA':<10} | {'ITEMS':>6} | {'DECODE µs/item':>14} | {'PARSE µs/item':>14}")
+    print("="*64)
+    for platform, cuerpos in payloads.items():
+        parse = get_platform(platform).parse
+        items = sum(_contar(parse(json.loads(c))) for c in cuerpos)
+        if not items:
+            print(f"   {platform:<10} | {0:>6} | {'-':>14} | {'-':>14}")
+            continue
+
+        t0 = time.perf_counter()
+        for _ in range(repeticiones):
+            decodificados = [json.loads(c) for c in cuerpos]
+        t1 = time.perf_counter()
+        for _ in range(repeticiones):
+            for d in decodificados:
+                parse(d)
+        t2 = time.perf_counter()
+
+        total = items * repeticiones
+        print(f"   {platform:<10} | {items:>6} | {(t1 - t0) / total * 1e6:>14.2f} | {(t2 - t1) / total * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        medir(payloads_grabados(sys.argv[1]))
+    else:
+        medir(payloads_desde_csv())
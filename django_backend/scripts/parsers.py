@@ -0,0 +1,143 @@
+from datetime import datetime, timezone
+
+# Capa de parseo compartida por las salidas CSV y DB.
+# Cada payload se decodifica una sola vez (response.json()) y de cada item
+# se extraen solo los campos que persistimos, en un PostRecord compacto.
+
+
+class PostRecord:
+    __slots__ = ('fecha', 'likes', 'comments', 'views', 'shares', 'description')
+
+    def __init__(self, fecha, likes, comments, views, shares, description):
+        self.fecha = fecha              # datetime aware (UTC) o None
+        self.likes = likes
+        self.comments = comments
+        self.views = views
+        self.shares = shares
+        self.description = description
+
+    def fecha_csv(self, formato, hora_local=True):
+        """
+        IG/TK escribían la hora local del servidor (fromtimestamp); X escribía
+        la hora tal como viene en la API. `hora_local=False` conserva esa zona.
+        """
+        if not self.fecha:
+            return "N/A"
+        return (self.fecha.astimezone() if hora_local else self.fecha).strftime(formato)
+
+
+_VACIO = {}
+
+
+def _desde_timestamp(ts):
+    return datetime.fromtimestamp(int(ts), tz=timezone.utc) if ts else None
+
+
+def _texto(valor):
+    return valor.replace('\n', ' ') if valor else ""
+
+
+def parse_ig(payload):
+    """
+    Payload de instagram-looter2 /web-profile.
+    Devuelve (user_id, seguidores, [PostRecord]) o None si no hay usuario.
+    """
+    user = (payload.get('data') or _VACIO).get('user') if 'data' in payload else payload.get('user')
+    if not user:
+        return None
+
+    seguidores = (user.get('edge_followed_by') or _VACIO).get('count', 0)
+    edges = (user.get('edge_owner_to_timeline_media') or _VACIO).get('edges') or ()
+
+    registros = []
+    for edge in edges:
+        node = edge.get('node') or _VACIO
+        caption = (node.get('edge_media_to_caption') or _VACIO).get('edges')
+        registros.append(PostRecord(
+            _desde_timestamp(node.get('taken_at_timestamp')),
+            (node.get('edge_liked_by') or _VACIO).get('count', 0),
+            (node.get('edge_media_to_comment') or _VACIO).get('count', 0),
+            0,
+            0,
+            _texto((caption[0].get('node') or _VACIO).get('text')) if caption else "",
+        ))
+    return user.get('id') or '', seguidores, registros
+
+
+def parse_tk_user(payload):
+    """Payload de tiktok-api23 /api/user/info -> dict cacheable o None."""
+    user_info = payload.get('userInfo')
+    if not user_info:
+        return None
+    stats = user_info.get('stats') or _VACIO
+    return {
+        "secUid": (user_info.get('user') or _VACIO).get('id'),
+        "followers": stats.get('followerCount', 0),
+        "hearts": stats.get('heart', 0),
+    }
+
+
+def parse_tk_posts(payload):
+    """Payload de tiktok-scraper7 /user/posts -> [PostRecord]."""
+    items = (payload.get('data') or _VACIO).get('videos') or ()
+    return [
+        PostRecord(
+            _desde_timestamp(item.get('create_time')),
+            item.get('digg_count', 0),
+            item.get('comment_count', 0),
+            item.get('play_count', 0),
+            0,
+            _texto(item.get('title')),
+        )
+        for item in items
+    ]
+
+
+def parse_x_user(payload):
+    """Payload de twitter241 /user -> dict cacheable o None."""
+    result = (((payload.get('result') or _VACIO).get('data') or _VACIO).get('user') or _VACIO).get('result')
+    if not result:
+        return None
+    return {
+        "rest_id": result.get('rest_id'),
+        "followers": (result.get('legacy') or _VACIO).get('followers_count', 0),
+    }
+
+
+_MESES = {m: i for i, m in enumerate(
+    ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), 1)}
+
+
+def _fecha_x(fecha_str):
+    """Convierte 'Tue Feb 17 01:01:13 +0000 2026' a un datetime aware."""
+    if not fecha_str:
+        return None
+    try:
+        # X siempre responde en UTC con este formato exacto; cualquier otra
+        # variante (offset, espaciado) cae a strptime
+        _, mes, dia, hora, offset, anio = fecha_str.split(' ')
+        if offset == '+0000' and mes in _MESES:
+            h, m, sec = hora.split(':')
+            return datetime(int(anio), _MESES[mes], int(dia), int(h), int(m), int(sec), tzinfo=timezone.utc)
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(fecha_str, "%a %b %d %H:%M:%S %z %Y")
+    except ValueError as e:
+        print(f"Error procesando fecha de X: {e}")
+        return None
+
+
+def parse_x_timeline(payload):
+    """Payload de twitter-api45 /timeline.php -> [PostRecord]."""
+    return [
+        PostRecord(
+            _fecha_x(tweet.get('created_at')),
+            tweet.get('favorites', 0),
+            tweet.get('replies', 0),
+            tweet.get('views', 0),
+            tweet.get('retweets', 0),
+            _texto(tweet.get('text')),
+        )
+        for tweet in payload.get('timeline') or ()
+    ]
@@ -0,0 +1,195 @@
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+# Parámetros por defecto; se sobreescriben con settings.SCRAPER_PIPELINE
+# a nivel global ('default') o por plataforma.
+CONFIG_DEFAULT = {
+    'fetch_workers': 2,     # peticiones HTTP simultáneas
+    'parse_workers': 1,
+    'db_workers': 1,        # SQLite serializa escrituras; subir solo con otro motor
+    'queue_size': 8,        # capacidad de cada cola entre etapas (backpressure)
+    'report_seconds': 15,   # intervalo del reporte de colas/throughput (0 = solo al final)
+}
+
+_FIN = object()
+
+
+def obtener_config(platform):
+    config = dict(CONFIG_DEFAULT)
+    overrides = getattr(settings, 'SCRAPER_PIPELINE', {})
+    config.update(overrides.get('default', {}))
+    config.update(overrides.get(platform, {}))
+    return config
+
+
+class RotadorKeys:
+    """
+    Índice de key compartido entre los workers de fetch. Solo avanza si
+    nadie lo movió ya, así dos fallos simultáneos con la misma key no
+    queman dos keys.
+    """
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.idx = 0
+        self._lock = threading.Lock()
+
+    def actual(self):
+        with self._lock:
+            return self.idx if self.idx < len(self.keys) else None
+
+    def avanzar(self, desde):
+        with self._lock:
+            if self.idx == desde:
+                self.idx += 1
+
+
+class Etapa:
+    """
+    Etapa del pipeline: `workers` hilos consumen de una cola acotada y
+    envían cada resultado de `funcion` a las colas de las etapas
+    siguientes. `funcion` devuelve un iterable de salidas o None.
+    Un put bloqueante sobre una cola llena frena a la etapa anterior.
+    """
+
+    def __init__(self, nombre, funcion, workers=1, capacidad=8):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.workers = workers
+        self.entrada = queue.Queue(maxsize=capacidad)
+        self.siguientes = []
+        self.procesados = 0
+        self.ocupado = 0.0
+        self.errores = 0
+        self._hilos = []
+        self._lock = threading.Lock()
+
+    def conectar(self, *etapas):
+        self.siguientes.extend(etapas)
+        return self
+
+    def iniciar(self):
+        for i in range(self.workers):
+            hilo = threading.Thread(target=self._trabajar, name=f"{self.nombre}-{i}", daemon=True)
+            hilo.start()
+            self._hilos.append(hilo)
+
+    def cerrar(self):
+        for _ in self._hilos:
+            self.entrada.put(_FIN)
+        for hilo in self._hilos:
+            hilo.join()
+
+    def _trabajar(self):
+        try:
+            while True:
+                item = self.entrada.get()
+                if item is _FIN:
+                    break
+                inicio = time.perf_counter()
+                try:
+                    salidas = self.funcion(item)
+                except Exception as e:
+                    salidas = None
+                    with self._lock:
+                        self.errores += 1
+                    print(f"[pipeline] Error en etapa {self.nombre}: {e}")
+                with self._lock:
+                    self.procesados += 1
+                    self.ocupado += time.perf_counter() - inicio
+                for salida in salidas or ():
+                    for etapa in self.siguientes:
+                        etapa.entrada.put(salida)
+        finally:
+            # Cada hilo abre su propia conexión de Django; se libera al terminar
+            connections.close_all()
+
+    def stats(self, transcurrido):
+        with self._lock:
+            procesados, ocupado, errores = self.procesados, self.ocupado, self.errores
+        return {
+            'stage': self.nombre,
+            'workers': self.workers,
+            'queue_depth': self.entrada.qsize(),
+            'queue_capacity': self.entrada.maxsize,
+            'processed': procesados,
+            'errors': errores,
+            'throughput': round(procesados / transcurrido, 2) if transcurrido else 0.0,
+            # Fracción del tiempo que los workers estuvieron trabajando: ~1.0 = cuello de botella
+            'utilization': round(ocupado / (transcurrido * self.workers), 2) if transcurrido else 0.0,
+        }
+
+
+class Pipeline:
+    """
+    Etapas en orden topológico; la primera recibe los items de entrada.
+    Se cierran en ese mismo orden para que ninguna etapa termine antes de
+    recibir todo lo que producen las anteriores.
+    """
+
+    def __init__(self, nombre, etapas, report_seconds=0):
+        self.nombre = nombre
+        self.etapas = etapas
+        self.report_seconds = report_seconds
+        self.inicio = None
+        self.fin = None
+
+    def stats(self):
+        """Estado en vivo de cada etapa; se congela al terminar el pipeline."""
+        if not self.inicio:
+            return []
+        transcurrido = (self.fin or time.monotonic()) - self.inicio
+        return [etapa.stats(transcurrido) for etapa in self.etapas]
+
+    def reportar(self):
+        print(f"[pipeline {self.nombre}] " + " | ".join(
+            f"{s['stage']}: cola {s['queue_depth']}/{s['queue_capacity']}, "
+            f"{s['processed']} items, {s['throughput']}/s, uso {s['utilization']:.0%}"
+            for s in self.stats()
+        ))
+
+    def ejecutar(self, items):
+        self.inicio = time.monotonic()
+        for etapa in self.etapas:
+            etapa.iniciar()
+
+        terminado = threading.Event()
+        if self.report_seconds:
+            def _reportero():
+                while not terminado.wait(self.report_seconds):
+                    self.reportar()
+            threading.Thread(target=_reportero, daemon=True).start()
+
+        try:
+            for item in items:
+                self.etapas[0].entrada.put(item)
+        finally:
+            for etapa in self.etapas:
+                etapa.cerrar()
+            self.fin = time.monotonic()
+            terminado.set()
+        self.reportar()
+        return self.stats()
+
+
+def construir_pipeline(platform, fetch, parse, guardar_db, escribir_csv, registrar=None):
+    """
+    fetch -> parse -> (db, csv). El CSV usa un solo worker porque comparte
+    el archivo abierto; el resto toma su paralelismo de la configuración.
+    `registrar(pipeline)` permite a quien lanza la corrida consultar
+    pipeline.stats() mientras se ejecuta.
+    """
+    config = obtener_config(platform)
+    capacidad = config['queue_size']
+    db = Etapa('db', guardar_db, config['db_workers'], capacidad)
+    export = Etapa('csv', escribir_csv, 1, capacidad)
+    parser = Etapa('parse', parse, config['parse_workers'], capacidad).conectar(db, export)
+    fetcher = Etapa('fetch', fetch, config['fetch_workers'], capacidad).conectar(parser)
+    pipeline = Pipeline(platform, [fetcher, parser, db, export], config['report_seconds'])
+    if registrar:
+        registrar(pipeline)
+    return pipeline
@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+from django.conf import settings
+
+# Valores por defecto; se sobreescriben con settings.SCRAPER_RESILIENCE
+# a nivel global ('default'), por plataforma o por plataforma + propósito.
+CONFIG_DEFAULT = {
+    'failure_threshold': 3,      # fallos seguidos para abrir el circuito
+    'reset_timeout': 60,         # segundos abierto antes de pasar a half-open
+    'hedge': False,              # enviar una segunda petición con otra key
+    'hedge_percentile': 95,      # percentil de latencia que dispara el hedge
+    'hedge_min_delay': 2.0,      # piso (segundos) para no duplicar todo
+    'hedge_min_samples': 20,     # muestras necesarias para usar el percentil
+}
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """El host está marcado como no saludable; no se envía la petición."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por host. Tras `failure_threshold` fallos seguidos se
+    abre y rechaza peticiones durante `reset_timeout` segundos; después deja
+    pasar una sola petición de prueba (half-open) para decidir si cierra.
+    """
+
+    def __init__(self, host, failure_threshold, reset_timeout):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.latencias = deque(maxlen=200)
+        self._probe_en_curso = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._probe_en_curso = False
+            if self.state == HALF_OPEN and not self._probe_en_curso:
+                self._probe_en_curso = True
+                return True
+            return False
+
+    def record_success(self, latencia):
+        with self._lock:
+            self.latencias.append(latencia)
+            self.failures = 0
+            self.state = CLOSED
+            self._probe_en_curso = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_en_curso = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    print(f"[circuit] {self.host} abierto tras {self.failures} fallos")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def percentil(self, p, min_samples):
+        with self._lock:
+            if len(self.latencias) < min_samples:
+                return None
+            ordenadas = sorted(self.latencias)
+        pos = min(len(ordenadas) - 1, int(round(p / 100.0 * (len(ordenadas) - 1))))
+        return ordenadas[pos]
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def obtener_config(platform, purpose):
+    config = dict(CONFIG_DEFAULT)
+    overrides = getattr(settings, 'SCRAPER_RESILIENCE', {})
+    config.update(overrides.get('default', {}))
+    por_plataforma = overrides.get(platform, {})
+    config.update({k: v for k, v in por_plataforma.items() if not isinstance(v, dict)})
+    config.update(por_plataforma.get(purpose, {}))
+    return config
+
+
+def obtener_breaker(host, config):
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host, config['failure_threshold'], config['reset_timeout'])
+            _breakers[host] = breaker
+        return breaker
+
+
+def _enviar(breaker, url, key, host, params, timeout):
+    headers = {"x-rapidapi-key": key, "x-rapidapi-host": host}
+    inicio = time.monotonic()
+    try:
+        response = requests.get(url, headers=headers, params=params, timeout=timeout)
+    except requests.RequestException:
+        breaker.record_failure()
+        raise
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        # 429 es cuota de la key, no salud del host
+        breaker.record_success(time.monotonic() - inicio)
+    return response
+
+
+def peticion_resiliente(platform, purpose, url, host, keys, idx, params, timeout):
+    """
+    GET contra un host de RapidAPI protegido por su circuit breaker.
+    Si el hedge está activo y la petición supera el percentil de latencia
+    configurado, se lanza una segunda con la siguiente key y se devuelve
+    la primera respuesta 200 (o la de la key principal si ninguna lo es).
+    Lanza CircuitOpenError sin tocar la red si el host está abierto.
+    """
+    config = obtener_config(platform, purpose)
+    breaker = obtener_breaker(host, config)
+    if not breaker.allow():
+        raise CircuitOpenError(f"{host} no disponible (circuito abierto)")
+
+    if not config['hedge'] or idx + 1 >= len(keys) or breaker.state != CLOSED:
+        return _enviar(breaker, url, keys[idx], host, params, timeout)
+
+    umbral = breaker.percentil(config['hedge_percentile'], config['hedge_min_samples'])
+    espera = max(config['hedge_min_delay'], umbral or config['hedge_min_delay'])
+
+    executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        principal = executor.submit(_enviar, breaker, url, keys[idx], host, params, timeout)
+        hechos, _ = wait([principal], timeout=espera)
+        if hechos:
+            return principal.result()
+
+        hedge = executor.submit(_enviar, breaker, url, keys[idx + 1], host, params, timeout)
+        pendientes = {principal, hedge}
+        while pendientes:
+            hechos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in hechos:
+                if futuro.exception() is None and futuro.result().status_code == 200:
+                    return futuro.result()
+        return principal.result()
+    finally:
+        executor.shutdown(wait=False)
@@ -9,8 +9,8 @@ def mostrar_historico(criterio):
     print(f"   BÚSQUEDA DE HISTÓRICO: '{criterio.upper()}'")
     print("="*60)
 
-    posts = ScrapeResult.objects.filter(
-        Q(username__iregex=criterio) | Q(username__iexact=criterio)
+    posts = ScrapeResult.objects.select_related('profile').filter(
+        Q(profile__handle__iregex=criterio) | Q(profile__handle__iexact=criterio)
     ).order_by('-created_at')
 
     if not posts.exists():
@@ -23,7 +23,7 @@ def mostrar_historico(criterio):
     for post in posts:
         fecha = post.created_at.strftime("%Y-%m-%d %H:%M")
         plataforma = post.platform.upper()
-        usuario_db = post.username
+        usuario_db = post.profile.handle
         descripcion = (post.description[:60].replace('\n', ' ') + '...') if post.description and len(post.description) > 60 else (post.description or "Sin descripción")
         
         print(f"{fecha:<18} | {plataforma:<10} | {usuario_db:<15} | {descripcion}")
\ No newline at end of file
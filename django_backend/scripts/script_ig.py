@@ -1,39 +1,36 @@
-import requests
 import csv
 import os
 from datetime import datetime
 
-from django_backend.models import ScrapeResult
-from django.utils.timezone import make_aware
+from django_backend.models import Profile, ScrapeResult
+from django_backend.scripts.resiliencia import peticion_resiliente, CircuitOpenError
+from django_backend.scripts.parsers import parse_ig
+from django_backend.scripts.pipeline import construir_pipeline, RotadorKeys
 
 HOY = datetime.now().strftime("%Y_%m_%d")
 
-def guardar_en_db(target, seguidores, fecha_obj, likes, comms, desc):
+def guardar_en_db(perfil, registros):
     """
-    Recibe fecha_obj directamente como un objeto datetime
+    Inserta todos los PostRecord de un perfil en una sola consulta
     """
     try:
-        fecha_dt = None
-        if fecha_obj:
-            # Si el objeto no tiene zona horaria, se la añadimos para Django
-            if fecha_obj.tzinfo is None:
-                fecha_dt = make_aware(fecha_obj)
-            else:
-                fecha_dt = fecha_obj
-
-        ScrapeResult.objects.create(
-            platform='ig',
-            username=target,
-            followers=seguidores,
-            post_date=fecha_dt,
-            likes=likes,
-            comments=comms,
-            description=desc
-        )
+        ScrapeResult.objects.bulk_create([
+            ScrapeResult(
+                platform='ig',
+                profile=perfil,
+                post_date=registro.fecha,
+                likes=registro.likes,
+                comments=registro.comments,
+                description=registro.description
+            )
+            for registro in registros
+        ])
+        return True
     except Exception as e:
         print(f"Error al guardar en DB (Instagram): {e}")
+        return False
 
-def analizar_con_rotacion(lista_keys, lista_targets):
+def analizar_con_rotacion(lista_keys, lista_targets, progreso=None, registrar_pipeline=None):
     host = "instagram-looter2.p.rapidapi.com"
     url = "https://instagram-looter2.p.rapidapi.com/web-profile"
     
@@ -41,64 +38,75 @@ def analizar_con_rotacion(lista_keys, lista_targets):
         os.makedirs('results')
         
     nombre_archivo = f"results/datos_ig_{HOY}.csv"
-    key_actual_index = 0
+    rotador = RotadorKeys(lista_keys)
     
     if not os.path.exists(nombre_archivo):
         with open(nombre_archivo, mode='w', newline='', encoding='utf-8-sig') as file:
             writer = csv.writer(file)
             writer.writerow(['USUARIO', 'SEGUIDORES', 'FECHA', 'TIPO', 'LIKES', 'COMMS', 'DESCRIPCION'])
 
-    for target in lista_targets:
-        exito = False
-        while not exito and key_actual_index < len(lista_keys):
-            headers = {
-                "x-rapidapi-key": lista_keys[key_actual_index],
-                "x-rapidapi-host": host
-            }
-            
+    def terminar(target, resultado):
+        # resultado: 'ok', 'skipped' (circuito abierto / sin keys) o 'failed'
+        if progreso:
+            progreso(target, resultado)
+
+    # --- Etapa 1: red ---
+    def fetch(target):
+        while (idx := rotador.actual()) is not None:
             try:
-                response = requests.get(url, headers=headers, params={"username": target}, timeout=15)
-                print(f"Respuesta_IG {response.json()}")
-                if response.status_code == 429:
-                    key_actual_index += 1
-                    continue 
-                
+                response = peticion_resiliente('ig', 'general', url, host, lista_keys, idx,
+                                               {"username": target}, 15)
                 if response.status_code == 200:
-                    res_data = response.json()
-                    user = res_data.get('data', {}).get('user', {}) if 'data' in res_data else res_data.get('user', {})
-                    
-                    if user:
-                        seguidores = user.get('edge_followed_by', {}).get('count', 0)
-                        edges = user.get('edge_owner_to_timeline_media', {}).get('edges', [])
-                        
-                        with open(nombre_archivo, mode='a', newline='', encoding='utf-8-sig') as file_append:
-                            writer = csv.writer(file_append)
-                            
-                            for edge in edges:
-                                node = edge.get('node', {})
-                                timestamp = node.get('taken_at_timestamp')
-                                fecha_dt_obj = datetime.fromtimestamp(timestamp) if timestamp else None
-                                fecha_csv = fecha_dt_obj.strftime('%d/%m/%Y') if fecha_dt_obj else "N/A"
-                                
-                                caption_edges = node.get('edge_media_to_caption', {}).get('edges', [])
-                                desc = caption_edges[0].get('node', {}).get('text', "").replace('\n', ' ') if caption_edges else ""
-                                
-                                likes = node.get('edge_liked_by', {}).get('count', 0)
-                                comms = node.get('edge_media_to_comment', {}).get('count', 0)
-
-                                writer.writerow([target, seguidores, fecha_csv, "Post", likes, comms, desc])
-                                
-                                guardar_en_db(target, seguidores, fecha_dt_obj, likes, comms, desc)
-                        
-                        print(f" @{target} procesado y guardado en DB.")
-                        exito = True
-                    else:
-                        exito = True 
-                else:
-                    key_actual_index += 1
+                    return [(target, response)]
+                rotador.avanzar(idx)
+            except CircuitOpenError as e:
+                # No se quema la key: el problema es el host, no la cuota
+                print(f"Saltando @{target}: {e}")
+                break
             except Exception as e:
                 print(f"Error: {e}")
-                key_actual_index += 1
+                rotador.avanzar(idx)
+        terminar(target, 'skipped')
+
+    # --- Etapa 2: parseo ---
+    def parse(item):
+        target, response = item
+        salida = None
+        try:
+            parseado = parse_ig(response.json())
+            if parseado:
+                user_id, seguidores, registros = parseado
+                salida = [(target, user_id, seguidores, registros)]
+            return salida
+        finally:
+            # Sin salida (usuario no encontrado o error de parseo) el perfil termina aquí
+            if salida is None:
+                terminar(target, 'failed')
+
+    # --- Etapa 3: salidas ---
+    def persistir(item):
+        target, user_id, seguidores, registros = item
+        resultado = 'failed'
+        try:
+            perfil = Profile.objects.record_snapshot('ig', target, seguidores, user_id)
+            if guardar_en_db(perfil, registros):
+                resultado = 'ok'
+                print(f" @{target} procesado y guardado en DB.")
+        finally:
+            terminar(target, resultado)
+
+    with open(nombre_archivo, mode='a', newline='', encoding='utf-8-sig') as file_append:
+        writer = csv.writer(file_append)
+
+        def exportar(item):
+            target, _, seguidores, registros = item
+            writer.writerows(
+                [target, seguidores, registro.fecha_csv('%d/%m/%Y'), "Post",
+                 registro.likes, registro.comments, registro.description]
+                for registro in registros
+            )
+
+        return construir_pipeline('ig', fetch, parse, persistir, exportar, registrar_pipeline).ejecutar(lista_targets)
 
-def iniciar(mis_apis_keys, lista_perfiles):
-    analizar_con_rotacion(mis_apis_keys, lista_perfiles)
\ No newline at end of file
+def iniciar(mis_apis_keys, lista_perfiles, progreso=None, registrar_pipeline=None):
+    return analizar_con_rotacion(mis_apis_keys, lista_perfiles, progreso, registrar_pipeline)
\ No newline at end of file
@@ -8,14 +8,9 @@ from django.db.models.functions import ExtractWeekDay
 from django.utils import timezone
 from django.db.models import F, ExpressionWrapper, FloatField
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
-
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
-django.setup()
-
-from django_backend.models import ScrapeResult
-
 def mostrar_metricas():
+    from django_backend.models import Profile, ScrapeResult
+
     print("="*40)
     print("   DASHBOARD DE MÉTRICAS REALES")
     print("="*40)
@@ -28,11 +23,11 @@ def mostrar_metricas():
         print("La base de datos está vacía.")
         return
 
-    total_profiles = ScrapeResult.objects.values('username').distinct().count()
+    total_profiles = Profile.objects.count()
     
-    avg_engagement_pct = ScrapeResult.objects.filter(followers__gt=0).annotate(
+    avg_engagement_pct = ScrapeResult.objects.with_followers().filter(followers_at_post__gt=0).annotate(
         engagement_post=ExpressionWrapper(
-            (F('likes') + F('comments')) * 100.0 / F('followers'),
+            (F('likes') + F('comments')) * 100.0 / F('followers_at_post'),
             output_field=FloatField()
         )
     ).aggregate(Avg('engagement_post'))['engagement_post__avg'] or 0
@@ -66,4 +61,8 @@ def mostrar_metricas():
     print(json.dumps(metricas, indent=4))
 
 if __name__ == "__main__":
+    # Solo al ejecutarse como script; importar el módulo no configura Django
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    django.setup()
     mostrar_metricas()
\ No newline at end of file
@@ -1,37 +1,35 @@
-import requests
 import csv
 import json
 import os
+import threading
 from datetime import datetime
 # Importación del modelo de Django
-from django_backend.models import ScrapeResult
-from django.utils.timezone import make_aware 
+from django_backend.models import Profile, ScrapeResult
+from django_backend.scripts.resiliencia import peticion_resiliente, CircuitOpenError
+from django_backend.scripts.parsers import parse_tk_user, parse_tk_posts
+from django_backend.scripts.pipeline import construir_pipeline, RotadorKeys
 
 ARCHIVO_IDS = "usuarios_tiktok_registrados.json"
 HOY = datetime.now().strftime("%Y_%m_%d")
 
-def guardar_en_db(target, seguidores, fecha_str, likes, comentarios,vistas, desc):
+def guardar_en_db(perfil, registros):
     try:
-        fecha_dt = None
-        if fecha_str and fecha_str != "N/A":
-            try:
-                naive_datetime = datetime.strptime(fecha_str, '%d/%m/%Y %H:%M:%S')
-                fecha_dt = make_aware(naive_datetime)
-            except Exception as e_fecha:
-                print(f"Error parseando fecha {fecha_str}: {e_fecha}")
-
-        ScrapeResult.objects.create(
-            platform='tk',
-            username=target,
-            followers=seguidores if isinstance(seguidores, int) else 0,
-            post_date=fecha_dt,
-            likes=likes,
-            comments=comentarios,
-            views=vistas,
-            description=desc
-        )
+        ScrapeResult.objects.bulk_create([
+            ScrapeResult(
+                platform='tk',
+                profile=perfil,
+                post_date=registro.fecha,
+                likes=registro.likes,
+                comments=registro.comments,
+                views=registro.views,
+                description=registro.description
+            )
+            for registro in registros
+        ])
+        return True
     except Exception as e:
         print(f"Error crítico al guardar en DB (TikTok): {e}")
+        return False
 
 
 def cargar_cache_ids():
@@ -44,10 +42,11 @@ def guardar_cache_ids(cache):
     with open(ARCHIVO_IDS, 'w') as f:
         json.dump(cache, f, indent=4)
 
-def analizar_tiktok_optimizado(keys_search, keys_posts, lista_targets):
+def analizar_tiktok_optimizado(keys_search, keys_posts, lista_targets, progreso=None, registrar_pipeline=None):
     cache_uids = cargar_cache_ids()
+    cache_lock = threading.Lock()
     nombre_csv = f"results/datos_tk_{HOY}.csv"
-    idx_s, idx_p = 0, 0
+    rotador_s, rotador_p = RotadorKeys(keys_search), RotadorKeys(keys_posts)
 
     if not os.path.exists('results'): os.makedirs('results')
     
@@ -56,77 +55,102 @@ def analizar_tiktok_optimizado(keys_search, keys_posts, lista_targets):
             writer = csv.writer(f)
             writer.writerow(['USUARIO', 'SEGUIDORES', 'CORAZONES_TOTALES', 'FECHA_POST', 'LIKES_VIDEO', 'VISTAS', 'DESCRIPCION'])
 
-    for target in lista_targets:
-        info_perfil = cache_uids.get(target)
-        
-        # 1. Obtener ID del usuario si no está en caché
-        if not info_perfil:
-            while idx_s < len(keys_search):
-                headers = {
-                    "x-rapidapi-key": keys_search[idx_s], 
-                    "x-rapidapi-host": "tiktok-api23.p.rapidapi.com"
-                }
-                try:
-                    res = requests.get("https://tiktok-api23.p.rapidapi.com/api/user/info", 
-                                       headers=headers, params={"uniqueId": target}, timeout=10)
-                    res_json = res.json()
-                    if res.status_code == 200:
-                        user_info = res_json.get('userInfo', {})
-                        if user_info:
-                            stats = user_info.get('stats', {})
-                            info_perfil = {
-                                "secUid": user_info.get('user', {}).get('id'),
-                                "followers": stats.get('followerCount', 0),
-                                "hearts": stats.get('heart', 0)
-                            }
-                            cache_uids[target] = info_perfil
-                            guardar_cache_ids(cache_uids)
-                            break
-                    idx_s += 1
-                except:
-                    idx_s += 1
+    def terminar(target, resultado):
+        # resultado: 'ok', 'skipped' (circuito abierto / sin keys) o 'failed'
+        if progreso:
+            progreso(target, resultado)
+
+    def obtener_perfil(target):
+        # Seguidores y corazones se leen en vivo en cada corrida; el archivo
+        # de caché solo guarda el secUid, que no cambia.
+        while (idx := rotador_s.actual()) is not None:
+            try:
+                res = peticion_resiliente('tk', 'search', "https://tiktok-api23.p.rapidapi.com/api/user/info",
+                                          "tiktok-api23.p.rapidapi.com", keys_search, idx,
+                                          {"uniqueId": target}, 10)
+                if res.status_code == 200:
+                    info_perfil = parse_tk_user(res.json())
+                    if info_perfil:
+                        with cache_lock:
+                            if (cache_uids.get(target) or {}).get("secUid") != info_perfil["secUid"]:
+                                cache_uids[target] = {"secUid": info_perfil["secUid"]}
+                                guardar_cache_ids(cache_uids)
+                        return info_perfil
+                rotador_s.avanzar(idx)
+            except CircuitOpenError as e:
+                print(f"Sin datos en vivo de @{target}: {e}")
+                break
+            except:
+                rotador_s.avanzar(idx)
+
+        # Sin lectura en vivo: los posts se piden con el secUid cacheado, sin
+        # seguidores (record_snapshot no registra un snapshot falso)
+        with cache_lock:
+            sec_uid = (cache_uids.get(target) or {}).get("secUid")
+        return {"secUid": sec_uid, "followers": None, "hearts": None} if sec_uid else None
 
+    # --- Etapa 1: red (ID del usuario si no está en caché + posts) ---
+    def fetch(target):
+        info_perfil = obtener_perfil(target)
         if info_perfil:
-            sec_uid = info_perfil.get("secUid")
-            seguidores = info_perfil.get("followers")
-            corazones = info_perfil.get("hearts")
-
-            exito_posts = False
-            while idx_p < len(keys_posts) and not exito_posts:
-                headers_p = {
-                    "x-rapidapi-key": keys_posts[idx_p], 
-                    "x-rapidapi-host": "tiktok-scraper7.p.rapidapi.com"
-                }
+            while (idx := rotador_p.actual()) is not None:
                 try:
-                    res_p = requests.get("https://tiktok-scraper7.p.rapidapi.com/user/posts", 
-                                         headers=headers_p, params={"user_id": sec_uid, "count": "35"}, timeout=15)
+                    res_p = peticion_resiliente('tk', 'posts', "https://tiktok-scraper7.p.rapidapi.com/user/posts",
+                                                "tiktok-scraper7.p.rapidapi.com", keys_posts, idx,
+                                                {"user_id": info_perfil.get("secUid"), "count": "35"}, 15)
                     if res_p.status_code == 200:
-                        items = res_p.json().get('data', {}).get('videos', [])
-                        if items:
-                            with open(nombre_csv, mode='a', newline='', encoding='utf-8-sig') as f:
-                                writer = csv.writer(f)
-                                for item in items:
-                                    likes = item.get('digg_count', 0)
-                                    comentarios = item.get('comment_count', 0)
-                                    vistas = item.get('play_count', 0)
-                                    ts = item.get('create_time')
-                                    fecha_txt = datetime.fromtimestamp(int(ts)).strftime('%d/%m/%Y %H:%M:%S') if ts else "N/A"
-                                    descripcion = item.get('title', '').replace('\n', ' ')
-                                    
-                                    # --- GUARDADO DOBLE ---
-                                    # CSV
-                                    writer.writerow([target, seguidores, corazones, fecha_txt, likes, vistas, descripcion])
-                                    # Base de Datos Django
-                                    print(f"Datos {target}, {seguidores} {fecha_txt}, {likes}, {vistas}, {descripcion}")
-                                    guardar_en_db(target, seguidores, fecha_txt, likes, comentarios,vistas, descripcion)
-                            
-                            print(f"  @{target} procesado y sincronizado con Django.")
-                        exito_posts = True
-                    else:
-                        idx_p += 1
+                        return [(target, info_perfil, res_p)]
+                    rotador_p.avanzar(idx)
+                except CircuitOpenError as e:
+                    print(f"Saltando @{target}: {e}")
+                    break
                 except:
-                    idx_p += 1
+                    rotador_p.avanzar(idx)
+        terminar(target, 'skipped')
+
+    # --- Etapa 2: parseo ---
+    def parse(item):
+        target, info_perfil, res_p = item
+        salida = None
+        resultado = 'failed'
+        try:
+            registros = parse_tk_posts(res_p.json())
+            if registros:
+                salida = [(target, info_perfil, registros)]
+            else:
+                resultado = 'ok'  # perfil sin posts: nada que guardar
+            return salida
+        finally:
+            # Sin salida (vacío o error de parseo) el perfil termina aquí
+            if salida is None:
+                terminar(target, resultado)
+
+    # --- Etapa 3: salidas (GUARDADO DOBLE) ---
+    def persistir(item):
+        target, info_perfil, registros = item
+        resultado = 'failed'
+        try:
+            perfil = Profile.objects.record_snapshot('tk', target, info_perfil.get("followers"), info_perfil.get("secUid") or '')
+            if guardar_en_db(perfil, registros):
+                resultado = 'ok'
+                print(f"  @{target} procesado y sincronizado con Django.")
+        finally:
+            terminar(target, resultado)
+
+    with open(nombre_csv, mode='a', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+
+        def exportar(item):
+            target, info_perfil, registros = item
+            seguidores, corazones = info_perfil.get("followers"), info_perfil.get("hearts")
+            writer.writerows(
+                [target, "N/A" if seguidores is None else seguidores, "N/A" if corazones is None else corazones, registro.fecha_csv('%d/%m/%Y %H:%M:%S'),
+                 registro.likes, registro.views, registro.description]
+                for registro in registros
+            )
+
+        return construir_pipeline('tk', fetch, parse, persistir, exportar, registrar_pipeline).ejecutar(lista_targets)
 
-def iniciar(keys_de_100, keys_de_300, lista_perfiles):
+def iniciar(keys_de_100, keys_de_300, lista_perfiles, progreso=None, registrar_pipeline=None):
     print(f"\n--- INICIANDO MÓDULO TIKTOK (DB CONNECTED) ---")
-    analizar_tiktok_optimizado(keys_de_100, keys_de_300, lista_perfiles)
\ No newline at end of file
+    return analizar_tiktok_optimizado(keys_de_100, keys_de_300, lista_perfiles, progreso, registrar_pipeline)
\ No newline at end of file
@@ -1,49 +1,36 @@
-import requests
 import csv
 import json
 import os
+import threading
 from datetime import datetime
-from django_backend.models import ScrapeResult
-from django.utils.timezone import make_aware
+from django_backend.models import Profile, ScrapeResult
+from django_backend.scripts.resiliencia import peticion_resiliente, CircuitOpenError
+from django_backend.scripts.parsers import parse_x_user, parse_x_timeline
+from django_backend.scripts.pipeline import construir_pipeline, RotadorKeys
 
-def guardar_en_db(target, seguidores, fecha_obj, likes, replies, retweets, vistas, desc):
+def guardar_en_db(perfil, registros):
     """
-    Inserta los resultados en la base de datos de Django.
-    Recibe fecha_obj ya como un objeto datetime.
+    Inserta los PostRecord de un perfil en la base de datos de Django
+    con una sola consulta. Las fechas ya vienen parseadas como datetime aware.
     """
     try:
-        # Si ya es un objeto datetime, solo nos aseguramos de que sea 'aware'
-        fecha_dt = None
-        if fecha_obj:
-            if fecha_obj.tzinfo is None:
-                fecha_dt = make_aware(fecha_obj)
-            else:
-                fecha_dt = fecha_obj
-
-        ScrapeResult.objects.create(
-            platform='x',  # CORRECCIÓN: Estaba como 'ig'
-            username=target,
-            followers=seguidores if isinstance(seguidores, int) else 0,
-            post_date=fecha_dt,
-            likes=likes,
-            comments=replies,  # Mapeamos replies a comments en el modelo
-            views=vistas,
-            description=desc
-        )
+        ScrapeResult.objects.bulk_create([
+            ScrapeResult(
+                platform='x',  # CORRECCIÓN: Estaba como 'ig'
+                profile=perfil,
+                post_date=registro.fecha,
+                likes=registro.likes,
+                comments=registro.comments,  # Mapeamos replies a comments en el modelo
+                views=registro.views,
+                description=registro.description
+            )
+            for registro in registros
+        ])
+        return True
     except Exception as e:
         print(f"Error al guardar en DB (X/Twitter): {e}")
+        return False
 
-def formatear_fecha_x(fecha_str):
-    """Convierte 'Tue Feb 17 01:01:13 +0000 2026' a un objeto datetime."""
-    try:
-        if not fecha_str:
-            return None
-        formato_entrada = "%a %b %d %H:%M:%S %z %Y"
-        return datetime.strptime(fecha_str, formato_entrada)
-    except Exception as e:
-        print(f"Error procesando fecha de X: {e}")
-        return None
-    
 ARCHIVO_IDS = "usuarios_X_registrados.json"
 HOY = datetime.now().strftime("%Y_%m_%d")
 
@@ -57,10 +44,11 @@ def guardar_cache_ids(cache):
     with open(ARCHIVO_IDS, 'w') as f:
         json.dump(cache, f, indent=4)
 
-def analizar_X_optimizado(keys_user, keys_timeline, lista_targets):
+def analizar_X_optimizado(keys_user, keys_timeline, lista_targets, progreso=None, registrar_pipeline=None):
     cache_ids = cargar_cache_ids()
+    cache_lock = threading.Lock()
     nombre_csv = f"results/datos_X_{HOY}.csv"
-    idx_u, idx_t = 0, 0
+    rotador_u, rotador_t = RotadorKeys(keys_user), RotadorKeys(keys_timeline)
 
     if not os.path.exists('results'): os.makedirs('results')
     
@@ -69,75 +57,103 @@ def analizar_X_optimizado(keys_user, keys_timeline, lista_targets):
             writer = csv.writer(f)
             writer.writerow(['USUARIO', 'CANTIDAD_SEGUIDORES', 'FECHA_POST', 'LIKES', 'REPLIES', 'RETWEETS', 'VISTAS', 'DESCRIPCION'])
 
-    for target in lista_targets:
-        user_info = cache_ids.get(target)
-        
-        # 1. Obtener rest_id si no está en caché
-        if not user_info:
-            while idx_u < len(keys_user):
-                headers_u = {"x-rapidapi-key": keys_user[idx_u], "x-rapidapi-host": "twitter241.p.rapidapi.com"}
-                try:
-                    res_u = requests.get("https://twitter241.p.rapidapi.com/user", 
-                                       headers=headers_u, params={"username": target}, timeout=10)
-                    if res_u.status_code == 200:
-                        data = res_u.json()
-                        info_profunda = data.get('result', {}).get('data', {}).get('user', {}).get('result', {})
-                        if info_profunda:
-                            legacy = info_profunda.get('legacy', {})
-                            user_info = {
-                                "rest_id": info_profunda.get('rest_id'),
-                                "followers": legacy.get('followers_count', 0)
-                            }
-                            cache_ids[target] = user_info
-                            guardar_cache_ids(cache_ids)
-                            break
-                    idx_u += 1
-                except:
-                    idx_u += 1
+    def terminar(target, resultado):
+        # resultado: 'ok', 'skipped' (circuito abierto / sin keys) o 'failed'
+        if progreso:
+            progreso(target, resultado)
+
+    def obtener_usuario(target):
+        # Los seguidores se leen en vivo en cada corrida; el archivo de caché
+        # solo guarda el rest_id, que no cambia.
+        while (idx := rotador_u.actual()) is not None:
+            try:
+                res_u = peticion_resiliente('x', 'search', "https://twitter241.p.rapidapi.com/user",
+                                            "twitter241.p.rapidapi.com", keys_user, idx,
+                                            {"username": target}, 10)
+                if res_u.status_code == 200:
+                    user_info = parse_x_user(res_u.json())
+                    if user_info:
+                        with cache_lock:
+                            if (cache_ids.get(target) or {}).get("rest_id") != user_info["rest_id"]:
+                                cache_ids[target] = {"rest_id": user_info["rest_id"]}
+                                guardar_cache_ids(cache_ids)
+                        return user_info
+                rotador_u.avanzar(idx)
+            except CircuitOpenError as e:
+                print(f"Sin datos en vivo de @{target}: {e}")
+                break
+            except:
+                rotador_u.avanzar(idx)
 
-        # 2. Extraer Timeline
+        # Sin lectura en vivo: se sigue con el rest_id cacheado y sin
+        # seguidores (record_snapshot no registra un snapshot falso)
+        with cache_lock:
+            rest_id = (cache_ids.get(target) or {}).get("rest_id")
+        return {"rest_id": rest_id, "followers": None} if rest_id else None
+
+    # --- Etapa 1: red (usuario + timeline) ---
+    def fetch(target):
+        user_info = obtener_usuario(target)
         if user_info:
-            exito_timeline = False
-            while idx_t < len(keys_timeline) and not exito_timeline:
-                headers_t = {"x-rapidapi-key": keys_timeline[idx_t], "x-rapidapi-host": "twitter-api45.p.rapidapi.com"}
+            while (idx := rotador_t.actual()) is not None:
                 try:
-                    res_t = requests.get("https://twitter-api45.p.rapidapi.com/timeline.php", 
-                                       headers=headers_t, params={"screenname": target}, timeout=15)
-                    
+                    res_t = peticion_resiliente('x', 'posts', "https://twitter-api45.p.rapidapi.com/timeline.php",
+                                                "twitter-api45.p.rapidapi.com", keys_timeline, idx,
+                                                {"screenname": target}, 15)
                     if res_t.status_code == 200:
-                        tweets = res_t.json().get('timeline', [])
-                        with open(nombre_csv, mode='a', newline='', encoding='utf-8-sig') as f:
-                            writer = csv.writer(f)
-                            for tweet in tweets:
-                                fecha_dt = formatear_fecha_x(tweet.get('created_at'))
-                                fecha_str = fecha_dt.strftime("%d/%m/%Y %H:%M:%S") if fecha_dt else "N/A"
-                                desc = tweet.get('text', '').replace('\n', ' ')
-                                
-                                # --- GUARDADO DOBLE ---
-                                # CSV
-                                writer.writerow([
-                                    target, user_info['followers'], fecha_str,
-                                    tweet.get('favorites', 0), tweet.get('replies', 0),
-                                    tweet.get('retweets', 0), tweet.get('views', 0), desc
-                                ])
-                                guardar_en_db(
-                                target, 
-                                user_info['followers'], 
-                                fecha_dt,
-                                tweet.get('favorites', 0), 
-                                tweet.get('replies', 0),
-                                tweet.get('retweets', 0), 
-                                tweet.get('views', 0), 
-                                desc
-                            )
-                        print(f" ✅ @{target} sincronizado con la base de datos.")
-                        exito_timeline = True
-                    else:
-                        idx_t += 1
+                        return [(target, user_info, res_t)]
+                    rotador_t.avanzar(idx)
+                except CircuitOpenError as e:
+                    print(f"Saltando @{target}: {e}")
+                    break
                 except:
-                    idx_t += 1
+                    rotador_t.avanzar(idx)
+        terminar(target, 'skipped')
+
+    # --- Etapa 2: parseo ---
+    def parse(item):
+        target, user_info, res_t = item
+        salida = None
+        resultado = 'failed'
+        try:
+            registros = parse_x_timeline(res_t.json())
+            if registros:
+                salida = [(target, user_info, registros)]
+            else:
+                resultado = 'ok'  # perfil sin posts: nada que guardar
+            return salida
+        finally:
+            # Sin salida (vacío o error de parseo) el perfil termina aquí
+            if salida is None:
+                terminar(target, resultado)
+
+    # --- Etapa 3: salidas (GUARDADO DOBLE) ---
+    def persistir(item):
+        target, user_info, registros = item
+        resultado = 'failed'
+        try:
+            perfil = Profile.objects.record_snapshot('x', target, user_info.get('followers'), user_info.get('rest_id') or '')
+            if guardar_en_db(perfil, registros):
+                resultado = 'ok'
+                print(f" ✅ @{target} sincronizado con la base de datos.")
+        finally:
+            terminar(target, resultado)
+
+    with open(nombre_csv, mode='a', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+
+        def exportar(item):
+            target, user_info, registros = item
+            writer.writerows(
+                [target, "N/A" if user_info.get('followers') is None else user_info['followers'], registro.fecha_csv("%d/%m/%Y %H:%M:%S", hora_local=False),
+                 registro.likes, registro.comments,
+                 registro.shares, registro.views, registro.description]
+                for registro in registros
+            )
+
+        return construir_pipeline('x', fetch, parse, persistir, exportar, registrar_pipeline).ejecutar(lista_targets)
 
-def iniciar(keys_busqueda, keys_timeline, lista_perfiles):
+def iniciar(keys_busqueda, keys_timeline, lista_perfiles, progreso=None, registrar_pipeline=None):
     print(f"\n--- INICIANDO MÓDULO X (DB CONNECTED) ---")
     if not lista_perfiles: return
-    analizar_X_optimizado(keys_busqueda, keys_timeline, lista_perfiles)
\ No newline at end of file
+    return analizar_X_optimizado(keys_busqueda, keys_timeline, lista_perfiles, progreso, registrar_pipeline)
\ No newline at end of file
@@ -1,12 +1,19 @@
-
 from rest_framework import serializers
 from .models import ScrapeResult, ScraperKey
 
 class ScrapeResultSerializer(serializers.ModelSerializer):
+    # Se mantienen los campos planos que consume el dashboard
+    username = serializers.CharField(source='profile.handle', read_only=True)
+    followers = serializers.SerializerMethodField()
+
     class Meta:
         model = ScrapeResult
         fields = '__all__'
 
+    def get_followers(self, obj):
+        # Seguidores cuando se extrajo el post si el queryset viene de with_followers()
+        return getattr(obj, 'followers_at_post', obj.profile.followers)
+
 class ScraperKeySerializer(serializers.ModelSerializer):
     class Meta:
         model = ScraperKey
@@ -0,0 +1,63 @@
+import time
+
+from django.test import SimpleTestCase
+
+from django_backend.jobs import (
+    ExtractionJob, JobDemasiadoGrande, PresupuestoExcedido, _liberar, _reservar, targets_en_vuelo,
+)
+
+
+def _esperar(job, segundos=5):
+    limite = time.monotonic() + segundos
+    while job.finished_at is None and time.monotonic() < limite:
+        time.sleep(0.01)
+    return job.to_dict()
+
+
+class ExtractionJobResultadosTests(SimpleTestCase):
+
+    def test_reporta_omitidos_y_fallidos_por_plataforma(self):
+        def funcion(targets, progreso=None, registrar_pipeline=None):
+            for target, resultado in zip(targets, ('ok', 'skipped', 'skipped', 'failed')):
+                progreso(target, resultado)
+
+        estado = _esperar(ExtractionJob({'tk': (funcion, (), ['a', 'b', 'c', 'd'])}).start())
+        self.assertEqual(estado['progress'], 100.0)
+        self.assertEqual(
+            (estado['completed_targets'], estado['skipped_targets'], estado['failed_targets']), (1, 2, 1)
+        )
+        self.assertEqual(estado['platforms']['tk'], {
+            'status': 'done', 'processed': 4, 'completed': 1, 'skipped': 2, 'failed': 1, 'total': 4,
+        })
+
+    def test_excepcion_cuenta_pendientes_como_fallidos_y_libera_presupuesto(self):
+        def funcion(targets, progreso=None, registrar_pipeline=None):
+            progreso(targets[0], 'ok')
+            raise RuntimeError('sin red')
+
+        estado = _esperar(ExtractionJob({'x': (funcion, (), ['a', 'b', 'c'])}).start())
+        self.assertEqual(estado['platforms']['x']['status'], 'failed')
+        self.assertEqual((estado['completed_targets'], estado['failed_targets']), (1, 2))
+        self.assertEqual(estado['errors'], {'x': 'sin red'})
+        self.assertEqual(targets_en_vuelo(), 0)
+
+
+class PresupuestoTests(SimpleTestCase):
+
+    def _funcion(self, targets, progreso=None, registrar_pipeline=None):
+        pass
+
+    def test_job_mayor_que_el_presupuesto_nunca_entra(self):
+        with self.settings(SCRAPER_INFLIGHT_TARGET_BUDGET=3):
+            with self.assertRaises(JobDemasiadoGrande):
+                ExtractionJob({'ig': (self._funcion, (), ['a', 'b', 'c', 'd'])}).start()
+        self.assertEqual(targets_en_vuelo(), 0)
+
+    def test_job_que_no_cabe_con_lo_que_hay_en_vuelo(self):
+        with self.settings(SCRAPER_INFLIGHT_TARGET_BUDGET=3):
+            _reservar(2)
+            try:
+                with self.assertRaises(PresupuestoExcedido):
+                    ExtractionJob({'ig': (self._funcion, (), ['a', 'b'])}).start()
+            finally:
+                _liberar(2)
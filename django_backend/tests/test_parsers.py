@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta, timezone
+
+from django.test import SimpleTestCase
+
+from django_backend.scripts.parsers import _fecha_x, parse_ig, parse_tk_posts, parse_x_timeline
+
+UTC = timezone.utc
+
+
+class FechaXTests(SimpleTestCase):
+
+    def test_formato_estandar_por_la_via_rapida(self):
+        self.assertEqual(_fecha_x('Tue Feb 17 01:01:13 +0000 2026'), datetime(2026, 2, 17, 1, 1, 13, tzinfo=UTC))
+
+    def test_dia_con_espacio_de_relleno_cae_a_strptime(self):
+        self.assertEqual(_fecha_x('Sat Feb  7 01:01:13 +0000 2026'), datetime(2026, 2, 7, 1, 1, 13, tzinfo=UTC))
+
+    def test_offset_distinto_de_utc_conserva_la_zona(self):
+        fecha = _fecha_x('Tue Feb 17 01:01:13 -0300 2026')
+        self.assertEqual(fecha.utcoffset(), timedelta(hours=-3))
+        self.assertEqual(fecha, datetime(2026, 2, 17, 4, 1, 13, tzinfo=UTC))
+
+    def test_vacia_o_invalida_devuelve_none(self):
+        self.assertIsNone(_fecha_x(''))
+        self.assertIsNone(_fecha_x(None))
+        self.assertIsNone(_fecha_x('ayer a la tarde'))
+
+
+class ParseIgTests(SimpleTestCase):
+
+    def _payload(self, edges):
+        return {'data': {'user': {
+            'id': '123',
+            'edge_followed_by': {'count': 5000},
+            'edge_owner_to_timeline_media': {'edges': edges},
+        }}}
+
+    def test_extrae_usuario_seguidores_y_posts(self):
+        user_id, seguidores, registros = parse_ig(self._payload([{'node': {
+            'taken_at_timestamp': 1700000000,
+            'edge_liked_by': {'count': 40},
+            'edge_media_to_comment': {'count': 3},
+            'edge_media_to_caption': {'edges': [{'node': {'text': 'hola\nmundo'}}]},
+        }}]))
+        self.assertEqual((user_id, seguidores), ('123', 5000))
+        self.assertEqual(len(registros), 1)
+        registro = registros[0]
+        self.assertEqual(registro.fecha, datetime.fromtimestamp(1700000000, tz=UTC))
+        self.assertEqual((registro.likes, registro.comments, registro.views), (40, 3, 0))
+        self.assertEqual(registro.description, 'hola mundo')
+
+    def test_post_sin_caption_ni_fecha(self):
+        _, _, registros = parse_ig(self._payload([{'node': {}}]))
+        self.assertIsNone(registros[0].fecha)
+        self.assertEqual((registros[0].likes, registros[0].description), (0, ''))
+        self.assertEqual(registros[0].fecha_csv('%d/%m/%Y'), 'N/A')
+
+    def test_user_en_la_raiz_del_payload(self):
+        user_id, seguidores, registros = parse_ig({'user': {'id': '9'}})
+        self.assertEqual((user_id, seguidores, registros), ('9', 0, []))
+
+    def test_sin_usuario_devuelve_none(self):
+        self.assertIsNone(parse_ig({'data': None}))
+        self.assertIsNone(parse_ig({}))
+
+
+class ParseTkPostsTests(SimpleTestCase):
+
+    def test_extrae_posts(self):
+        registros = parse_tk_posts({'data': {'videos': [
+            {'create_time': 1700000000, 'digg_count': 10, 'comment_count': 2, 'play_count': 900, 'title': 'a\nb'},
+            {},
+        ]}})
+        self.assertEqual(len(registros), 2)
+        primero, segundo = registros
+        self.assertEqual(primero.fecha, datetime.fromtimestamp(1700000000, tz=UTC))
+        self.assertEqual((primero.likes, primero.comments, primero.views), (10, 2, 900))
+        self.assertEqual(primero.description, 'a b')
+        self.assertIsNone(segundo.fecha)
+        self.assertEqual((segundo.likes, segundo.views, segundo.description), (0, 0, ''))
+
+    def test_payload_sin_videos(self):
+        self.assertEqual(parse_tk_posts({}), [])
+        self.assertEqual(parse_tk_posts({'data': {'videos': None}}), [])
+
+
+class ParseXTimelineTests(SimpleTestCase):
+
+    def test_extrae_tweets(self):
+        registros = parse_x_timeline({'timeline': [{
+            'created_at': 'Tue Feb 17 01:01:13 +0000 2026',
+            'favorites': 7, 'replies': 1, 'views': 350, 'retweets': 2, 'text': 'uno\ndos',
+        }]})
+        registro = registros[0]
+        self.assertEqual(registro.fecha, datetime(2026, 2, 17, 1, 1, 13, tzinfo=UTC))
+        self.assertEqual((registro.likes, registro.comments, registro.views, registro.shares), (7, 1, 350, 2))
+        self.assertEqual(registro.description, 'uno dos')
+        # X conserva la hora de la API (UTC) en el CSV
+        self.assertEqual(registro.fecha_csv('%d/%m/%Y %H:%M:%S', hora_local=False), '17/02/2026 01:01:13')
+
+    def test_timeline_vacio(self):
+        self.assertEqual(parse_x_timeline({}), [])
+        self.assertEqual(parse_x_timeline({'timeline': None}), [])
@@ -0,0 +1,46 @@
+import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+
+from django_backend.models import FollowerSnapshot, Profile, ScrapeResult
+
+
+class RecordSnapshotTests(TestCase):
+
+    def test_lectura_en_vivo_actualiza_y_registra_snapshot(self):
+        Profile.objects.record_snapshot('tk', 'marca', 100, 'sec1')
+        perfil = Profile.objects.record_snapshot('tk', 'marca', 150)
+        self.assertEqual(perfil.followers, 150)
+        self.assertEqual(perfil.native_id, 'sec1')
+        self.assertEqual(sorted(perfil.snapshots.values_list('followers', flat=True)), [100, 150])
+
+    def test_sin_lectura_en_vivo_conserva_valor_sin_snapshot(self):
+        Profile.objects.record_snapshot('x', 'marca', 100)
+        perfil = Profile.objects.record_snapshot('x', 'marca', None, '42')
+        perfil.refresh_from_db()
+        self.assertEqual(perfil.followers, 100)
+        self.assertEqual(perfil.native_id, '42')
+        self.assertEqual(FollowerSnapshot.objects.filter(profile=perfil).count(), 1)
+
+    def test_perfil_nuevo_sin_lectura_en_vivo(self):
+        perfil = Profile.objects.record_snapshot('x', 'nuevo', None, '7')
+        self.assertEqual(perfil.followers, 0)
+        self.assertFalse(perfil.snapshots.exists())
+
+
+class FollowersAtPostTests(TestCase):
+
+    def test_usa_el_snapshot_vigente_al_extraer_cada_post(self):
+        perfil = Profile.objects.create(platform='tk', handle='marca', followers=300)
+        ahora = timezone.now()
+        for dias, followers in ((10, 100), (5, 200)):
+            snapshot = FollowerSnapshot.objects.create(profile=perfil, followers=followers)
+            FollowerSnapshot.objects.filter(pk=snapshot.pk).update(captured_at=ahora - datetime.timedelta(days=dias))
+        for dias in (12, 7, 1):
+            post = ScrapeResult.objects.create(platform='tk', profile=perfil, description=str(dias))
+            ScrapeResult.objects.filter(pk=post.pk).update(created_at=ahora - datetime.timedelta(days=dias))
+
+        conteos = {p.description: p.followers_at_post for p in ScrapeResult.objects.with_followers()}
+        # Sin snapshot previo se usa el valor actual del perfil
+        self.assertEqual(conteos, {'12': 300, '7': 100, '1': 200})
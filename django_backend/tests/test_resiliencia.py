@@ -0,0 +1,68 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from django_backend.scripts import resiliencia
+from django_backend.scripts.resiliencia import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+class CircuitBreakerTests(SimpleTestCase):
+
+    def setUp(self):
+        self.reloj = 1000.0
+        patcher = mock.patch.object(resiliencia.time, 'monotonic', side_effect=lambda: self.reloj)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker('host.test', failure_threshold=3, reset_timeout=60)
+
+    def _fallar(self, veces):
+        for _ in range(veces):
+            self.breaker.record_failure()
+
+    def test_cerrado_deja_pasar_hasta_el_umbral(self):
+        self._fallar(2)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_exito_reinicia_el_contador_de_fallos(self):
+        self._fallar(2)
+        self.breaker.record_success(0.1)
+        self._fallar(2)
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_se_abre_al_llegar_al_umbral_y_rechaza(self):
+        self._fallar(3)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_half_open_tras_reset_timeout_deja_una_sola_prueba(self):
+        self._fallar(3)
+        self.reloj += 61
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_prueba_exitosa_cierra_el_circuito(self):
+        self._fallar(3)
+        self.reloj += 61
+        self.breaker.allow()
+        self.breaker.record_success(0.2)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_prueba_fallida_reabre_el_circuito(self):
+        self._fallar(3)
+        self.reloj += 61
+        self.breaker.allow()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.reloj += 61
+        self.assertTrue(self.breaker.allow())
+
+    def test_percentil_requiere_muestras_minimas(self):
+        for latencia in range(1, 11):
+            self.breaker.record_success(latencia)
+        self.assertIsNone(self.breaker.percentil(95, 20))
+        self.assertEqual(self.breaker.percentil(50, 10), 5)
+        self.assertEqual(self.breaker.percentil(100, 10), 10)
@@ -0,0 +1,91 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from django_backend.models import ScraperKey
+
+
+class ScraperKeySyncTests(TestCase):
+
+    def setUp(self):
+        ScraperKey.objects.invalidate_cache()
+
+    def _crear(self, key_value, is_active=True, purpose='search', dias=0):
+        key = ScraperKey.objects.create(platform='tk', purpose=purpose, key_value=key_value, is_active=is_active)
+        # last_used es auto_now; se fija con update para simular antigüedad
+        ScraperKey.objects.filter(pk=key.pk).update(last_used=timezone.now() - datetime.timedelta(days=dias))
+        return key.pk
+
+    def _activas(self):
+        return sorted(ScraperKey.objects.filter(platform='tk', purpose='search', is_active=True)
+                      .values_list('key_value', flat=True))
+
+    def _sync(self, keys):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ScraperKey.objects.sync('tk', 'search', keys)
+
+    def test_inserta_las_nuevas(self):
+        cambios = self._sync(['a', ' b ', 'a', ''])
+        self.assertEqual(cambios, {'created': 2, 'reactivated': 0, 'deactivated': 0})
+        self.assertEqual(self._activas(), ['a', 'b'])
+
+    def test_reactiva_fila_existente_sin_insertar(self):
+        pk = self._crear('a', is_active=False, dias=5)
+        cambios = self._sync(['a'])
+        self.assertEqual(cambios, {'created': 0, 'reactivated': 1, 'deactivated': 0})
+        self.assertTrue(ScraperKey.objects.get(pk=pk).is_active)
+        self.assertEqual(ScraperKey.objects.count(), 1)
+
+    def test_desactiva_las_que_no_vienen(self):
+        self._crear('a')
+        pk_b = self._crear('b')
+        cambios = self._sync(['a'])
+        self.assertEqual(cambios, {'created': 0, 'reactivated': 0, 'deactivated': 1})
+        self.assertFalse(ScraperKey.objects.get(pk=pk_b).is_active)
+        self.assertEqual(self._activas(), ['a'])
+
+    def test_dedup_conserva_la_fila_activa(self):
+        viejo = self._crear('a', is_active=False, dias=10)
+        vivo = self._crear('a', is_active=True, dias=0)
+        cambios = self._sync(['a'])
+        self.assertEqual(cambios, {'created': 0, 'reactivated': 0, 'deactivated': 0})
+        self.assertEqual(list(ScraperKey.objects.values_list('pk', flat=True)), [vivo])
+        self.assertFalse(ScraperKey.objects.filter(pk=viejo).exists())
+
+    def test_dedup_sin_activas_conserva_la_mas_reciente(self):
+        self._crear('a', is_active=False, dias=1)
+        reciente = self._crear('a', is_active=False, dias=0)
+        self._crear('a', is_active=False, dias=7)
+        cambios = self._sync(['a'])
+        self.assertEqual(cambios['reactivated'], 1)
+        self.assertEqual(list(ScraperKey.objects.values_list('pk', flat=True)), [reciente])
+        self.assertTrue(ScraperKey.objects.get(pk=reciente).is_active)
+
+    def test_no_toca_otros_propositos(self):
+        pk = self._crear('p', purpose='posts')
+        self._sync(['a'])
+        self.assertTrue(ScraperKey.objects.get(pk=pk).is_active)
+
+    def test_sync_invalida_la_cache_de_llaves_activas(self):
+        self._sync(['a'])
+        self.assertEqual(ScraperKey.objects.active_keys('tk', 'search'), ['a'])
+        self._sync(['b'])
+        self.assertEqual(ScraperKey.objects.active_keys('tk', 'search'), ['b'])
+
+    def test_lectura_concurrente_con_sync_no_cachea_el_set_viejo(self):
+        self._crear('nuevo')
+
+        class ConsultaLenta:
+            # Simula un sync que commitea mientras esta lectura consulta la DB
+            def order_by(self, *campos):
+                return self
+
+            def values_list(self, *campos):
+                ScraperKey.objects.invalidate_cache('tk')
+                return [('search', 'viejo')]
+
+        with mock.patch.object(ScraperKey.objects, 'filter', return_value=ConsultaLenta()):
+            self.assertEqual(ScraperKey.objects.active_keys('tk', 'search'), ['viejo'])
+        self.assertEqual(ScraperKey.objects.active_keys('tk', 'search'), ['nuevo'])
@@ -1,23 +1,22 @@
 from django.db.models import Q
+from django.db import transaction
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from .models import ScrapeResult, ScraperKey
+from .models import Profile, ScrapeResult, ScraperKey
 from .serializers import ScrapeResultSerializer, ScraperKeySerializer
+from .jobs import ExtractionJob, JobDemasiadoGrande, PresupuestoExcedido, get_job
+from .platforms import get_platform
 from django.db.models import F, ExpressionWrapper, FloatField
 from django.db.models import Count, Avg
 from django.db.models.functions import ExtractWeekDay
 from django.utils import timezone
-import threading
 import datetime
 from django.http import JsonResponse
 import logging
 
 logger = logging.getLogger(__name__)
 
-from django_backend.scripts.script_ig import iniciar as iniciar_ig
-from django_backend.scripts.script_tk import iniciar as iniciar_tk
-from django_backend.scripts.script_x import iniciar as iniciar_x
 
 class ScraperViewSet(viewsets.ViewSet):
 
@@ -26,24 +25,35 @@ class ScraperViewSet(viewsets.ViewSet):
         data = request.data
                 
         try:
-            for platform, purposes in data.items():
-                for purpose, keys in purposes.items():
-                    logger.info(f"Updating keys for platform: {platform}, purpose: {purpose}")
-                    ScraperKey.objects.filter(platform=platform, purpose=purpose).update(is_active=False)
-                    
-                    for k in keys:
-                        if k.strip():
-                            ScraperKey.objects.create(
-                                platform=platform,
-                                purpose=purpose,
-                                key_value=k.strip(),
-                                is_active=True
-                            )
+            # Una sola transacción: los lectores ven el set anterior o el nuevo, nunca uno parcial
+            with transaction.atomic():
+                for platform, purposes in data.items():
+                    for purpose, keys in purposes.items():
+                        cambios = ScraperKey.objects.sync(platform, purpose, keys)
+                        logger.info(f"Updating keys for platform: {platform}, purpose: {purpose}: {cambios}")
             return Response({'status': 'Keys updated successfully'}, status=status.HTTP_200_OK)
         except Exception as e:
             logger.error(f"Error updating keys: {e}")
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
+    def _pipeline_para(self, platform):
+        """Devuelve (funcion_iniciar, args_de_llaves) o None si faltan llaves."""
+        descriptor = get_platform(platform)
+        if not descriptor:
+            return None
+
+        if not descriptor.key_purposes:
+            keys = ScraperKey.objects.active_keys(platform)
+            return (descriptor.fetch, (keys,)) if keys else None
+
+        args = []
+        for purpose in descriptor.key_purposes:
+            keys = ScraperKey.objects.active_keys(platform, purpose)
+            if not keys:
+                return None
+            args.append(keys)
+        return descriptor.fetch, tuple(args)
+
     @action(detail=False, methods=['post'])
     def trigger_extraction(self, request):
         platform = request.data.get('platform')
@@ -51,42 +61,80 @@ class ScraperViewSet(viewsets.ViewSet):
         
         start_time = timezone.now().isoformat()
 
+        # Forma multi-plataforma: {"targets": {"marca": {"ig": "..", "tk": "..", "x": ".."}}}
+        if isinstance(targets, dict):
+            return self._trigger_multi(targets)
+
         if not platform or not targets:
             return Response({'error': 'Faltan parámetros (platform o targets)'}, 
                             status=status.HTTP_400_BAD_REQUEST)
 
-        thread = None
-        target_function = None
+        if not get_platform(platform):
+            return Response({'error': f'Plataforma desconocida: {platform}'}, status=status.HTTP_400_BAD_REQUEST)
 
-        if platform == 'ig':
-            keys = list(ScraperKey.objects.filter(platform='ig', is_active=True).values_list('key_value', flat=True))
-            if keys:
-                thread = threading.Thread(target=iniciar_ig, args=(keys, targets))
-        elif platform == 'tk':
-            keys_search = list(ScraperKey.objects.filter(platform='tk', purpose='search', is_active=True).values_list('key_value', flat=True))
-            keys_posts = list(ScraperKey.objects.filter(platform='tk', purpose='posts', is_active=True).values_list('key_value', flat=True))
-            
-            if keys_search and keys_posts:
-                print(f"DEBUG TikTok: Search Keys: {len(keys_search)}, Post Keys: {len(keys_posts)}")
-                thread = threading.Thread(target=iniciar_tk, args=(keys_search, keys_posts, targets))
-        elif platform == 'x':
-            keys_search = list(ScraperKey.objects.filter(platform='x', purpose='search', is_active=True).values_list('key_value', flat=True))
-            keys_posts = list(ScraperKey.objects.filter(platform='x', purpose='posts', is_active=True).values_list('key_value', flat=True))
-            if keys_search and keys_posts:
-                thread = threading.Thread(target=iniciar_x, args=(keys_search, keys_posts, targets))
-            else:
+        if not isinstance(targets, list) or not all(isinstance(t, str) for t in targets):
+            return Response({'error': 'targets debe ser una lista de perfiles'}, status=status.HTTP_400_BAD_REQUEST)
+
+        pipeline = self._pipeline_para(platform)
+        if not pipeline:
+            if platform == 'x':
                 return Response({'error': 'Faltan llaves de X (search o posts)'}, status=400)
+            return Response({'error': 'No se pudo iniciar el hilo. Revisa las llaves.'}, status=400)
 
-        if thread:
-            thread.daemon = True
-            thread.start()
-            return Response({
-                'status': 'Extracción iniciada', 
-                'platform': platform,
-                'started_at': start_time
-            }, status=status.HTTP_202_ACCEPTED)
-        
-        return Response({'error': 'No se pudo iniciar el hilo. Revisa las llaves.'}, status=400)
+        target_function, args = pipeline
+        respuesta = self._lanzar_job({platform: (target_function, args, targets)})
+        if respuesta.status_code == status.HTTP_202_ACCEPTED:
+            respuesta.data.update({'platform': platform, 'started_at': start_time})
+        return respuesta
+
+    def _lanzar_job(self, plan):
+        try:
+            job = ExtractionJob(plan).start()
+        except JobDemasiadoGrande as e:
+            # Reintentar no sirve: el cliente debe partir la lista
+            return Response({'error': str(e)}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        except PresupuestoExcedido as e:
+            # Entra cuando termine lo que está en vuelo
+            return Response({'error': str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        return Response({'status': 'Extracción iniciada', **job.to_dict()}, status=status.HTTP_202_ACCEPTED)
+
+    def _trigger_multi(self, targets):
+        por_plataforma = {}
+        for handle, cuentas in targets.items():
+            if not isinstance(cuentas, dict):
+                return Response({'error': f'Formato inválido para {handle}'}, status=status.HTTP_400_BAD_REQUEST)
+            for platform, cuenta in cuentas.items():
+                if not get_platform(platform):
+                    return Response({'error': f'Plataforma desconocida: {platform}'},
+                                    status=status.HTTP_400_BAD_REQUEST)
+                if cuenta is None:
+                    continue
+                if not isinstance(cuenta, str):
+                    return Response({'error': f'Cuenta inválida para {handle}/{platform}'},
+                                    status=status.HTTP_400_BAD_REQUEST)
+                if cuenta.strip():
+                    por_plataforma.setdefault(platform, []).append(cuenta.strip())
+
+        if not por_plataforma:
+            return Response({'error': 'Faltan parámetros (targets)'}, status=status.HTTP_400_BAD_REQUEST)
+
+        plan = {}
+        for platform, cuentas in por_plataforma.items():
+            pipeline = self._pipeline_para(platform)
+            if not pipeline:
+                return Response({'error': f'Faltan llaves para la plataforma {platform}'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            target_function, args = pipeline
+            plan[platform] = (target_function, args, cuentas)
+
+        return self._lanzar_job(plan)
+
+    @action(detail=False, methods=['get'])
+    def extraction_status(self, request):
+        job = get_job(request.query_params.get('job_id', ''))
+        if not job:
+            return Response({'error': 'Job no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job.to_dict())
 
     
     @action(detail=False, methods=['get'])
@@ -95,7 +143,7 @@ class ScraperViewSet(viewsets.ViewSet):
         platform = request.query_params.get('platform')
         limit = int(request.query_params.get('limit', 1000))
 
-        queryset = ScrapeResult.objects.all().order_by('-created_at')
+        queryset = ScrapeResult.objects.with_followers().select_related('profile').order_by('-created_at')
 
         if platform:
             queryset = queryset.filter(platform=platform.lower())
@@ -117,10 +165,10 @@ class ScraperViewSet(viewsets.ViewSet):
             
             # Validación para evitar que el * rompa el Regex de SQL
             if criterio == '*' or criterio == '' or criterio == '.*':
-                posts = ScrapeResult.objects.all().order_by('-created_at')[:500]
+                posts = ScrapeResult.objects.with_followers().select_related('profile').order_by('-created_at')[:500]
             else:
-                posts = ScrapeResult.objects.filter(
-                    Q(username__iregex=criterio)
+                posts = ScrapeResult.objects.with_followers().select_related('profile').filter(
+                    Q(profile__handle__iregex=criterio)
                 ).order_by('-created_at')[:500]
 
             # Usamos el Serializer para evitar errores de formato manual
@@ -134,11 +182,12 @@ class ScraperViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'])
     def get_metrics(self, request):
         total_posts = ScrapeResult.objects.count()
-        total_profiles = ScrapeResult.objects.values('username').distinct().count()
+        total_profiles = Profile.objects.count()
 
-        avg_eng = ScrapeResult.objects.filter(followers__gt=0).annotate(
+        # Engagement contra los seguidores que tenía el perfil al extraer cada post
+        avg_eng = ScrapeResult.objects.with_followers().filter(followers_at_post__gt=0).annotate(
             rate=ExpressionWrapper(
-                (F('likes') + F('comments')) * 100.0 / F('followers'),
+                (F('likes') + F('comments')) * 100.0 / F('followers_at_post'),
                 output_field=FloatField()
             )
         ).aggregate(Avg('rate'))['rate__avg'] or 0